@@ -0,0 +1,101 @@
+"""Porównanie kodeków kompresji zapisu świata: czas zapisu, czas wczytania i rozmiar plików regionów.
+
+Uruchomienie z katalogu projektu:
+    python -m bench.compression_codecs [--chunks-x 16] [--chunks-y 8] [--json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from world_generator import WorldGenerator
+from world_manager import WorldManager
+from chunk_codec import encode_tiles
+
+# Kodeki i poziomy porównywane w benchmarku
+BENCH_CODECS = [('none', 0), ('zlib', 1), ('zlib', 6), ('zlib', 9), ('lzma', 0), ('lzma', 6)]
+
+
+class SampleChunk:
+    """Wygenerowany chunk przekazywany do WorldManager.save_world_data"""
+
+    def __init__(self, tiles):
+        self.tiles = tiles
+
+    def get_save_data(self) -> bytes:
+        return encode_tiles(self.tiles)
+
+
+def generate_sample_world(seed: int, chunks_x: int, chunks_y: int) -> dict:
+    """Generuje prostokąt chunków wokół punktu startowego (niebo, powierzchnia i jaskinie)"""
+    generator = WorldGenerator(seed)
+    return {(x, y): SampleChunk(generator.generate_chunk((x, y)))
+            for x in range(-chunks_x // 2, chunks_x - chunks_x // 2)
+            for y in range(-2, chunks_y - 2)}
+
+
+def bench_codec(chunks: dict, compression: str, level: int, world_name: str = None) -> dict:
+    """Zapisuje i wczytuje wszystkie chunki wybranym kodekiem w bieżącym katalogu"""
+    world_name = world_name or f"bench_{compression}_{level}"
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        world_manager = WorldManager(world_name, compression=compression, compression_level=level)
+        start = time.perf_counter()
+        world_manager.save_world_data(chunks).result()
+        save_time = time.perf_counter() - start
+        world_manager.close()
+
+    # Wczytanie nowym menedżerem, by ominąć cache i dane oczekujące na zapis
+    world_manager = WorldManager(world_name, compression=compression, compression_level=level)
+    start = time.perf_counter()
+    for position in chunks:
+        world_manager.load_chunk_data(position)
+    load_time = time.perf_counter() - start
+    world_manager.close()
+
+    size = sum(path.stat().st_size for path in Path('saves', world_name).iterdir())
+    return {
+        'codec': compression,
+        'level': level,
+        'chunks': len(chunks),
+        'save_ms': save_time * 1000,
+        'load_ms': load_time * 1000,
+        'size_bytes': size
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunks-x', type=int, default=16)
+    parser.add_argument('--chunks-y', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=121367)
+    parser.add_argument('--json', action='store_true', help='wynik w formacie JSON')
+    args = parser.parse_args()
+
+    chunks = generate_sample_world(args.seed, args.chunks_x, args.chunks_y)
+
+    # Zapisy trafiają do katalogu tymczasowego, a nie do saves/ gry
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.chdir(temp_dir)
+        try:
+            results = [bench_codec(chunks, compression, level) for compression, level in BENCH_CODECS]
+        finally:
+            os.chdir(cwd)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'kodek':<8}{'poziom':>7}{'zapis [ms]':>12}{'wczytanie [ms]':>16}{'rozmiar [B]':>13}")
+    for result in results:
+        print(f"{result['codec']:<8}{result['level']:>7}{result['save_ms']:>12.1f}"
+              f"{result['load_ms']:>16.1f}{result['size_bytes']:>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Odtwarzanie nagranego wejścia bez okna i bez limitu klatek - powtarzalne obciążenie do profilowania.
+
+Nagranie (python main.py --record recordings/tunel.rec) odtwarzane jest w nowym świecie o seedzie z nagrania,
+a stan symulacji po ostatnim kroku porównywany jest ze stanem zapisanym przy nagrywaniu (kod wyjścia 1 przy różnicy).
+
+Uruchomienie z katalogu projektu:
+    python -m bench.replay recordings/tunel.rec [--render] [--trace profiles/replay.csv] [--json]
+"""
+import os
+
+# Bez okna i dźwięku - ustawione przed importem pygame
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import pygame
+
+from settings import PROFILER_WINDOW
+from profiler import profiler
+from input_source import ReplayInput, load_recording
+from bench.suite import BenchApp, bench_directory, create_scene, close_scene
+
+
+def replay(ticks: list, world_seed: int, render: bool, trace_path: Path = None) -> dict:
+    """Wykonuje nagrane kroki symulacji w nowym świecie i zwraca czas przebiegu oraz końcowy stan"""
+    app = BenchApp(ReplayInput(ticks))
+    scene = create_scene(app, 'replay', synchronous_generation=True)
+    try:
+        if scene.world_seed != world_seed:
+            raise ValueError(f"Seed nowego świata ({scene.world_seed}) różni się od seeda nagrania ({world_seed})")
+
+        if trace_path:
+            profiler.window = max(1, len(ticks))
+            profiler.toggle()
+
+        start = time.perf_counter()
+        for _ in range(len(ticks)):
+            profiler.begin_frame()
+            with profiler.section('simulation'):
+                scene.update()
+            if render:
+                with profiler.section('draw'):
+                    scene.draw()
+            profiler.end_frame()
+        elapsed = time.perf_counter() - start
+
+        result = {
+            'ticks': len(ticks),
+            'elapsed_s': elapsed,
+            'ticks_per_s': len(ticks) / elapsed if elapsed else 0.0,
+            # Stan po przejściu przez JSON, jak w nagraniu
+            'state': json.loads(json.dumps(scene.get_simulation_state()))
+        }
+        if trace_path:
+            result['stats_ms'] = profiler.get_stats()
+            profiler.save_trace(trace_path)
+            profiler.toggle()
+            profiler.window = PROFILER_WINDOW
+        return result
+    finally:
+        close_scene(scene)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recording', type=Path)
+    parser.add_argument('--render', action='store_true', help='rysowanie sceny po każdym kroku')
+    parser.add_argument('--trace', type=Path, help='zapis śladu profilera (CSV lub JSON)')
+    parser.add_argument('--json', action='store_true', help='wynik w formacie JSON')
+    args = parser.parse_args()
+
+    recording, ticks = load_recording(args.recording)
+    # Ścieżka śladu względem katalogu uruchomienia, a nie katalogu tymczasowego
+    trace_path = args.trace.absolute() if args.trace else None
+
+    pygame.display.init()
+    pygame.font.init()
+    with bench_directory():
+        result = replay(ticks, recording['world_info']['seed'], args.render, trace_path)
+    pygame.quit()
+
+    expected = recording.get('final_state', {})
+    result['mismatched'] = [key for key, value in expected.items() if result['state'].get(key) != value]
+    result['state_match'] = not result['mismatched']
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Kroki: {result['ticks']}, czas: {result['elapsed_s']:.2f} s ({result['ticks_per_s']:.0f} kroków/s)")
+        if result['state_match']:
+            print("Stan symulacji zgodny z nagraniem")
+        else:
+            print(f"Stan symulacji różni się od nagrania: {', '.join(result['mismatched'])}")
+
+    if not result['state_match']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
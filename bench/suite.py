@@ -0,0 +1,310 @@
+"""Benchmark gorących ścieżek gry bez okna: generacja chunków, strumieniowanie, rysowanie kamery i zapis świata.
+
+Uruchomienie z katalogu projektu:
+    python -m bench.suite [--only generation streaming camera save] [--output wynik.json]
+    python -m bench.suite --baseline wynik.json [--threshold 0.15]
+
+Wszystkie metryki to czasy lub rozmiary (mniej = lepiej). Z --baseline wynik porównywany jest z wcześniejszym
+plikiem JSON, a metryki gorsze o więcej niż próg są oznaczane jako regresje (kod wyjścia 1).
+"""
+import os
+
+# Bez okna i dźwięku - ustawione przed importem pygame
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pygame
+
+from settings import *
+from world_generator import WorldGenerator
+from profiler import profiler
+from input_source import ReplayInput
+from bench.compression_codecs import generate_sample_world, bench_codec
+
+BENCHMARKS = ['generation', 'streaming', 'camera', 'save']
+
+# Rodzaje chunków: wiersz chunka (y) - niebo, powierzchnia i podziemia na kilku głębokościach
+GENERATION_CHUNK_TYPES = {
+    'sky': -1,
+    'surface': 0,
+    'underground_1': 1,
+    'underground_4': 4,
+    'underground_16': 16
+}
+
+# Skrypty ruchu gracza: pozycja startowa i przesunięcie na krok symulacji [px]
+STREAMING_SCENARIOS = {
+    'walk': ((0, 0), (12, 0)),
+    'fall': ((0, 0), (0, 12))
+}
+
+CAMERA_CHUNK_COUNTS = [9, 49, 121]
+SAVE_WORLD_SIZES = [(4, 4), (8, 8), (16, 16)]
+
+
+class BenchApp:
+    """Minimalny odpowiednik Game dla Scene: powierzchnia ekranu i źródło wejścia (domyślnie puste)"""
+
+    def __init__(self, input_source=None):
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.input = input_source or ReplayInput([])
+
+
+@contextlib.contextmanager
+def bench_directory():
+    """Katalog tymczasowy z kopią Assets - zapisy benchmarku nie trafiają do saves/ gry"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        shutil.copytree(os.path.join(cwd, 'Assets'), os.path.join(temp_dir, 'Assets'))
+        os.chdir(temp_dir)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+
+
+def create_scene(app: BenchApp, world_name: str, synchronous_generation: bool = False):
+    from scene import Scene
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Scene.create_new_world(app, world_name, synchronous_generation)
+
+
+def close_scene(scene):
+    """Zamyka scenę (zapis zmian, pula generacji i wątek zapisu)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        scene.close()
+
+
+def best_of(rounds: int, benchmark, *args) -> dict[str, float]:
+    """Powtarza benchmark i zwraca najlepszą (najmniejszą) wartość każdej metryki - mniej szumu między przebiegami"""
+    results = [benchmark(*args) for _ in range(rounds)]
+    return {name: min(result[name] for result in results) for name in results[0]}
+
+
+def percentiles_ms(samples: list[float]) -> dict[str, float]:
+    values = np.array(samples) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]).tolist()
+    return {'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': float(values.max())}
+
+
+def bench_generation(seed: int, count: int) -> dict[str, float]:
+    """Czas generacji jednego chunka dla każdego rodzaju chunka (w jednym procesie)"""
+    generator = WorldGenerator(seed)
+    metrics = {}
+    for chunk_type, chunk_y in GENERATION_CHUNK_TYPES.items():
+        generator.generate_chunk((-1, chunk_y))
+
+        samples = []
+        for x in range(count):
+            start = time.perf_counter()
+            generator.generate_chunk((x, chunk_y))
+            samples.append(time.perf_counter() - start)
+
+        metrics[f'generation.{chunk_type}.median_ms'] = float(np.median(samples)) * 1000
+    return metrics
+
+
+def wait_for_chunks(scene, timeout: float = 60):
+    """Aktualizuje scenę, aż wszystkie chunki w zasięgu wokół gracza będą aktywne"""
+    from scene import Chunk
+
+    player_position = scene.player.rect.topleft
+    center = Chunk.get_chunk_pos(scene.player.rect.center)
+    positions = scene.get_chunks_in_range(center, scene.chunk_render_distance)
+    deadline = time.perf_counter() + timeout
+    while not all(pos in scene.active_chunks for pos in positions):
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Chunki w zasięgu nie zostały wygenerowane w wyznaczonym czasie")
+        scene.player.rect.topleft = player_position
+        scene.update()
+        time.sleep(0.001)
+
+
+def bench_streaming(app: BenchApp, ticks: int) -> tuple[dict[str, float], dict]:
+    """Czas kroku Scene.update, gdy skryptowany gracz przemieszcza się przez świat bez limitu klatek"""
+    metrics, info = {}, {}
+    for name, (start_position, step) in STREAMING_SCENARIOS.items():
+        scene = create_scene(app, f'bench_streaming_{name}')
+        try:
+            scene.player.rect.topleft = start_position
+            wait_for_chunks(scene)
+
+            # Percentyle faz kroku z profilera, z oknem obejmującym cały przebieg
+            profiler.window = ticks
+            profiler.toggle()
+            samples = []
+            for tick in range(1, ticks + 1):
+                # Ruch skryptowany zamiast sterowania - ta sama trasa niezależnie od kolizji
+                scene.player.rect.topleft = (start_position[0] + step[0] * tick,
+                                             start_position[1] + step[1] * tick)
+                scene.player.velocity.update(0, 0)
+
+                profiler.begin_frame()
+                start = time.perf_counter()
+                scene.update()
+                samples.append(time.perf_counter() - start)
+                profiler.end_frame()
+            phase_stats = profiler.get_stats()
+            profiler.toggle()
+            profiler.window = PROFILER_WINDOW
+
+            for key, value in percentiles_ms(samples).items():
+                metrics[f'streaming.{name}.update_{key}'] = value
+            for phase in ('sprites', 'streaming', 'unload'):
+                if phase in phase_stats:
+                    metrics[f'streaming.{name}.{phase}_p95_ms'] = phase_stats[phase]['p95']
+
+            info[f'streaming.{name}'] = {
+                'ticks': ticks,
+                'generation_backlog': len(scene.generation_service.in_flight) + len(scene.generation_service.waiting),
+                'memory': scene.get_memory_stats()
+            }
+        finally:
+            close_scene(scene)
+    return metrics, info
+
+
+def bench_camera(app: BenchApp, repeat: int) -> dict[str, float]:
+    """Czas Camera.draw przy różnej liczbie załadowanych chunków wokół gracza"""
+    scene = create_scene(app, 'bench_camera')
+    metrics = {}
+    try:
+        scene.player.rect.topleft = (0, 0)
+        for chunk_count in CAMERA_CHUNK_COUNTS:
+            side = int(chunk_count ** 0.5)
+            scene.chunks.clear()
+            scene.active_chunks.clear()
+            for x in range(-(side // 2), side - side // 2):
+                for y in range(-(side // 2), side - side // 2):
+                    scene.attach_chunk((x, y), scene.world_generator.generate_chunk((x, y)))
+
+            # Pierwsze rysowanie renderuje powierzchnie widocznych chunków
+            start = time.perf_counter()
+            scene.sprites.draw(scene.player, app.screen, scene.active_chunks.values(), 0.5)
+            cold_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                scene.sprites.draw(scene.player, app.screen, scene.active_chunks.values(), 0.5)
+            warm_time = (time.perf_counter() - start) / repeat
+
+            metrics[f'camera.{chunk_count}_chunks.cold_ms'] = cold_time * 1000
+            metrics[f'camera.{chunk_count}_chunks.warm_ms'] = warm_time * 1000
+    finally:
+        close_scene(scene)
+    return metrics
+
+
+def bench_save(seed: int) -> dict[str, float]:
+    """Zapis i wczytanie wszystkich chunków światów różnej wielkości domyślnym kodekiem"""
+    # Każda runda zapisuje nowe światy, a nie nadpisuje poprzednie
+    shutil.rmtree('saves', ignore_errors=True)
+    metrics = {}
+    for chunks_x, chunks_y in SAVE_WORLD_SIZES:
+        chunks = generate_sample_world(seed, chunks_x, chunks_y)
+        result = bench_codec(chunks, SAVE_COMPRESSION, SAVE_COMPRESSION_LEVEL, f'bench_save_{chunks_x}x{chunks_y}')
+        for key in ('save_ms', 'load_ms', 'size_bytes'):
+            metrics[f'save.{chunks_x}x{chunks_y}.{key}'] = result[key]
+    return metrics
+
+
+def compare(metrics: dict[str, float], baseline: dict[str, float], threshold: float) -> list[dict]:
+    """Porównuje metryki z bazowymi; regresja to wzrost o więcej niż threshold (ułamek)"""
+    comparison = []
+    for name, value in metrics.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        change = value / base - 1 if base else 0.0
+        comparison.append({'metric': name, 'baseline': base, 'current': value, 'change': change,
+                           'regression': change > threshold})
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument('--seed', type=int, default=121367)
+    parser.add_argument('--rounds', type=int, default=3, help='powtórzenia generacji i zapisu (najlepszy wynik)')
+    parser.add_argument('--generation-count', type=int, default=32, help='chunki na rodzaj chunka')
+    parser.add_argument('--ticks', type=int, default=600, help='kroki symulacji na scenariusz strumieniowania')
+    parser.add_argument('--camera-repeat', type=int, default=200, help='powtórzenia rysowania kamery')
+    parser.add_argument('--output', help='zapis wyniku do pliku JSON')
+    parser.add_argument('--baseline', help='plik JSON z wcześniejszym wynikiem do porównania')
+    parser.add_argument('--threshold', type=float, default=0.15, help='dopuszczalny wzrost metryki (ułamek)')
+    parser.add_argument('--json', action='store_true', help='wynik w formacie JSON na standardowe wyjście')
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.font.init()
+
+    metrics, info = {}, {}
+    with bench_directory():
+        app = BenchApp()
+        if 'generation' in args.only:
+            metrics.update(best_of(args.rounds, bench_generation, args.seed, args.generation_count))
+        if 'streaming' in args.only:
+            streaming_metrics, streaming_info = bench_streaming(app, args.ticks)
+            metrics.update(streaming_metrics)
+            info.update(streaming_info)
+        if 'camera' in args.only:
+            metrics.update(bench_camera(app, args.camera_repeat))
+        if 'save' in args.only:
+            metrics.update(best_of(args.rounds, bench_save, args.seed))
+    pygame.quit()
+
+    result = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'save_compression': f'{SAVE_COMPRESSION}:{SAVE_COMPRESSION_LEVEL}',
+            'generation_workers': CHUNK_GENERATION_MAX_WORKERS
+        },
+        'metrics': metrics,
+        'info': info
+    }
+
+    comparison = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare(metrics, json.load(f)['metrics'], args.threshold)
+        result['comparison'] = comparison
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif comparison:
+        print(f"{'metryka':<42}{'bazowa':>12}{'bieżąca':>12}{'zmiana':>9}")
+        for entry in comparison:
+            flag = '  REGRESJA' if entry['regression'] else ''
+            print(f"{entry['metric']:<42}{entry['baseline']:>12.3f}{entry['current']:>12.3f}"
+                  f"{entry['change']:>+9.1%}{flag}")
+    else:
+        print(f"{'metryka':<42}{'wartość':>12}")
+        for name, value in metrics.items():
+            print(f"{name:<42}{value:>12.3f}")
+
+    if any(entry['regression'] for entry in comparison):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
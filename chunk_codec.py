@@ -0,0 +1,85 @@
+import struct
+
+import numpy as np
+
+from settings import CHUNK_SIZE, TILE_SIZE
+from texture_data import block_names, block_ids, AIR
+
+# Nagłówek: wersja kodeka, flagi, długość boku chunka, liczba wpisów palety
+CHUNK_CODEC_VERSION = 1
+HEADER = struct.Struct('<BBBB')
+FLAG_RLE = 0x01
+MAX_RUN_LENGTH = 255
+
+
+def encode_tiles(tiles: np.ndarray) -> bytes:
+    """Koduje siatkę bloków jako paletę nazw i indeksy uint8, z RLE gdy daje mniejszy wynik"""
+    ids, indices = np.unique(tiles, return_inverse=True)
+    indices = indices.astype(np.uint8).ravel()
+
+    # Paleta nazw zamiast identyfikatorów, by zapis nie zależał od kolejności tekstur
+    palette = b''
+    for block_id in ids.tolist():
+        name = block_names[block_id].encode('utf-8')
+        palette += bytes([len(name)]) + name
+
+    # Podział na serie identycznych indeksów, dłuższe serie dzielone na kawałki po MAX_RUN_LENGTH
+    starts = np.concatenate(([0], np.flatnonzero(indices[1:] != indices[:-1]) + 1))
+    lengths = np.diff(np.append(starts, indices.size))
+    pieces = (lengths + MAX_RUN_LENGTH - 1) // MAX_RUN_LENGTH
+    run_values = np.repeat(indices[starts], pieces)
+    run_lengths = np.full(run_values.size, MAX_RUN_LENGTH)
+    run_lengths[np.cumsum(pieces) - 1] = lengths - MAX_RUN_LENGTH * (pieces - 1)
+    # Pary (indeks, długość serii) po jednym bajcie
+    rle = np.column_stack((run_values, run_lengths)).astype(np.uint8).tobytes()
+
+    flags = 0
+    body = indices.tobytes()
+    if len(rle) < len(body):
+        flags |= FLAG_RLE
+        body = rle
+
+    return HEADER.pack(CHUNK_CODEC_VERSION, flags, tiles.shape[0], len(ids)) + palette + body
+
+
+def decode_tiles(data: bytes | memoryview) -> np.ndarray:
+    """Dekoduje siatkę bloków zapisaną przez encode_tiles; wynik nie odwołuje się do bufora data"""
+    version, flags, size, palette_size = HEADER.unpack_from(data)
+    if version > CHUNK_CODEC_VERSION:
+        raise ValueError(f"Nieobsługiwana wersja danych chunka: {version}")
+
+    offset = HEADER.size
+    palette = []
+    for _ in range(palette_size):
+        length = data[offset]
+        name = str(data[offset + 1:offset + 1 + length], 'utf-8')
+        palette.append(block_ids.get(name, AIR))
+        offset += 1 + length
+
+    if flags & FLAG_RLE:
+        runs = np.frombuffer(data, dtype=np.uint8, offset=offset).reshape(-1, 2)
+        indices = np.repeat(runs[:, 0], runs[:, 1])
+    else:
+        indices = np.frombuffer(data, dtype=np.uint8, count=size * size, offset=offset)
+
+    return np.array(palette, dtype=np.uint8)[indices].reshape(size, size)
+
+
+def tiles_from_legacy(chunks: dict[tuple[int, int], dict]) -> dict[tuple[int, int], np.ndarray]:
+    """Przenosi chunki ze starego zapisu JSON (listy bloków z pozycjami w pikselach) do siatek bloków.
+
+    Blok trafia do chunka, w którym leży jego kafelek, a nie do chunka, na którego liście był zapisany -
+    pierwotny generator umieszczał dolny wiersz chunka w górnym wierszu chunka poniżej.
+    """
+    tiles = {chunk_pos: np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8) for chunk_pos in chunks}
+    for data in chunks.values():
+        for block_info in data.get('blocks', []):
+            block_id = block_ids.get(block_info['name'], AIR)
+            tile_x = block_info['x'] // TILE_SIZE
+            tile_y = block_info['y'] // TILE_SIZE
+            chunk_pos = (tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE)
+
+            # Bloki w chunkach spoza zapisu są pomijane - te chunki odtworzy generator
+            if block_id != AIR and chunk_pos in tiles:
+                tiles[chunk_pos][tile_y % CHUNK_SIZE, tile_x % CHUNK_SIZE] = block_id
+    return tiles
@@ -0,0 +1,36 @@
+import lzma
+import zlib
+
+# Kodeki kompresji danych chunków; identyfikator kodeka zapisywany jest w nagłówku pliku regionu
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+
+COMPRESSION_CODECS = {
+    'none': COMPRESSION_NONE,
+    'zlib': COMPRESSION_ZLIB,
+    'lzma': COMPRESSION_LZMA
+}
+COMPRESSION_NAMES = {codec_id: name for name, codec_id in COMPRESSION_CODECS.items()}
+
+
+def compress(data, codec_id: int, level: int) -> bytes:
+    """Kompresuje dane wybranym kodekiem; poziom to level zlib (0-9) lub preset lzma (0-9)"""
+    if codec_id == COMPRESSION_ZLIB:
+        return zlib.compress(data, level)
+    if codec_id == COMPRESSION_LZMA:
+        return lzma.compress(data, preset=level)
+    if codec_id == COMPRESSION_NONE:
+        return bytes(data)
+    raise ValueError(f"Nieznany kodek kompresji: {codec_id}")
+
+
+def decompress(data, codec_id: int):
+    """Dekompresuje dane; dla kodeka 'none' zwraca przekazany bufor bez kopiowania"""
+    if codec_id == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    if codec_id == COMPRESSION_LZMA:
+        return lzma.decompress(data)
+    if codec_id == COMPRESSION_NONE:
+        return data
+    raise ValueError(f"Nieznany kodek kompresji: {codec_id}")
@@ -1,11 +1,16 @@
 import pygame
 import json
 import gzip
+import shutil
 from pathlib import Path
 from datetime import datetime
 from typing import List
 
 
+# Metadane wczytanych zapisów: ścieżka -> ((mtime, rozmiar) pliku, metadane)
+metadata_cache: dict[Path, tuple[tuple[int, int], dict]] = {}
+
+
 class SaveGameData:
     """Klasa reprezentująca dane zapisanej gry"""
 
@@ -23,10 +28,18 @@ class SaveGameData:
         """Wczytuje metadane zapisu"""
         try:
             if self.save_path.suffix == '.dat':
-                with gzip.open(self.save_path, 'rt', encoding='utf-8') as f:
-                    data = json.load(f)
+                # Plik .dat przechowuje tylko metadane (chunki są w plikach regionów),
+                # a niezmieniony od ostatniego odczytu plik nie jest czytany ponownie
+                stat = self.save_path.stat()
+                file_key = (stat.st_mtime_ns, stat.st_size)
+                cached = metadata_cache.get(self.save_path)
+                if cached and cached[0] == file_key:
+                    metadata = cached[1]
+                else:
+                    with gzip.open(self.save_path, 'rt', encoding='utf-8') as f:
+                        metadata = json.load(f).get('metadata', {})
+                    metadata_cache[self.save_path] = (file_key, metadata)
 
-                metadata = data.get('metadata', {})
                 self.metadata = metadata
                 self.last_played = datetime.fromtimestamp(metadata.get('last_modified', 0))
                 self.chunk_count = metadata.get('chunk_count', 0)
@@ -209,6 +222,11 @@ class GameLoaderMenu:
                 if backup_path.exists():
                     backup_path.unlink()
 
+                # Katalog z plikami regionów świata
+                region_dir = selected_save.save_path.with_suffix('')
+                if region_dir.is_dir():
+                    shutil.rmtree(region_dir)
+
                 print(f"Usunięto zapis: {selected_save.get_display_name()}")
 
                 self.refresh_saves()
@@ -397,14 +415,16 @@ class GameManager:
         elif self.current_state == 'game' and self.scene:
             self.scene.update()
 
-    def draw(self):
-        """Rysuje aktualny stan"""
+    def draw(self, alpha: float = 1.0):
+        """Rysuje aktualny stan (każdy stan sam wypełnia tło ekranu)"""
         if self.current_state == 'loader_menu':
             self.loader_menu.draw()
         elif self.current_state == 'game' and self.scene:
-            self.scene.draw()
+            self.scene.draw(alpha)
+        else:
+            self.app.screen.fill('lightblue')
 
-    def create_new_world(self, world_name: str = None):
+    def create_new_world(self, world_name: str = None, synchronous_generation: bool = False):
         """Tworzy nowy świat"""
         try:
             from scene import Scene
@@ -412,7 +432,7 @@ class GameManager:
             if world_name is None:
                 world_name = f"Nowy_Świat_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-            self.scene = Scene.create_new_world(self.app, world_name)
+            self.scene = Scene.create_new_world(self.app, world_name, synchronous_generation)
             self.current_state = 'game'
             print(f"Utworzono nowy świat: {world_name}")
             return {'action': 'world_created', 'world_name': world_name}
@@ -428,6 +448,8 @@ class GameManager:
     def back_to_loader_menu(self):
         """Powrót do menu loadera (nie działa)"""
         self.current_state = 'loader_menu'
+        if self.scene:
+            self.scene.close()
         self.scene = None
         self.loader_menu.refresh_saves()
 
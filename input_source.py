@@ -0,0 +1,135 @@
+import gzip
+import json
+from pathlib import Path
+
+import pygame
+
+# Klawisze sterowania odczytywane w każdym kroku symulacji (zapisywane w nagraniu jako maska bitowa)
+CONTROL_KEYS = (pygame.K_a, pygame.K_d, pygame.K_SPACE)
+# Naciśnięcia klawiszy przekazywane do symulacji jako zdarzenia (nawigacja w ekwipunku)
+EVENT_KEYS = (pygame.K_LEFT, pygame.K_RIGHT)
+
+RECORDING_VERSION = 1
+
+
+class TickInput:
+    """Wejście gracza w jednym kroku symulacji: trzymane klawisze, przyciski i pozycja myszy
+    oraz klawisze naciśnięte od poprzedniego kroku"""
+    __slots__ = ('held_keys', 'mouse_buttons', 'mouse_pos', 'key_presses')
+
+    def __init__(self, held_keys: frozenset = frozenset(), mouse_buttons: tuple = (False, False, False),
+                 mouse_pos: tuple[int, int] = (0, 0), key_presses: tuple = ()):
+        self.held_keys = held_keys
+        self.mouse_buttons = mouse_buttons
+        self.mouse_pos = mouse_pos
+        self.key_presses = key_presses
+
+    def is_held(self, key: int) -> bool:
+        return key in self.held_keys
+
+    def to_record(self) -> list:
+        """Zwraca zwięzłą postać do zapisu: [maska klawiszy, maska przycisków, x, y, naciśnięcia]"""
+        keys_mask = sum(1 << i for i, key in enumerate(CONTROL_KEYS) if key in self.held_keys)
+        buttons_mask = sum(1 << i for i, pressed in enumerate(self.mouse_buttons) if pressed)
+        return [keys_mask, buttons_mask, self.mouse_pos[0], self.mouse_pos[1], list(self.key_presses)]
+
+    @classmethod
+    def from_record(cls, record: list) -> 'TickInput':
+        keys_mask, buttons_mask, x, y, key_presses = record
+        return cls(frozenset(key for i, key in enumerate(CONTROL_KEYS) if keys_mask & (1 << i)),
+                   tuple(bool(buttons_mask & (1 << i)) for i in range(3)),
+                   (x, y), tuple(key_presses))
+
+
+class LiveInput:
+    """Wejście z klawiatury i myszy odczytywane raz na krok symulacji"""
+
+    def __init__(self):
+        # Naciśnięcia z obsługi zdarzeń czekające na najbliższy krok symulacji
+        self.pending_presses: list[int] = []
+
+    def push_key(self, key: int):
+        if key in EVENT_KEYS:
+            self.pending_presses.append(key)
+
+    def read_tick(self) -> TickInput:
+        pressed = pygame.key.get_pressed()
+        tick_input = TickInput(frozenset(key for key in CONTROL_KEYS if pressed[key]),
+                               tuple(pygame.mouse.get_pressed()),
+                               pygame.mouse.get_pos(),
+                               tuple(self.pending_presses))
+        self.pending_presses = []
+        return tick_input
+
+
+class ReplayInput:
+    """Odtwarza nagrane wejście krok po kroku; po końcu nagrania zwraca puste wejście"""
+
+    def __init__(self, ticks: list[TickInput]):
+        self.ticks = ticks
+        self.position = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.ticks)
+
+    def push_key(self, key: int):
+        pass
+
+    def read_tick(self) -> TickInput:
+        if self.finished:
+            return TickInput()
+        tick_input = self.ticks[self.position]
+        self.position += 1
+        return tick_input
+
+
+class InputRecorder:
+    """Przekazuje wejście innego źródła i zapamiętuje je dla każdego kroku symulacji"""
+
+    def __init__(self, source):
+        self.source = source
+        self.ticks: list[TickInput] = []
+
+    def push_key(self, key: int):
+        self.source.push_key(key)
+
+    def read_tick(self) -> TickInput:
+        tick_input = self.source.read_tick()
+        self.ticks.append(tick_input)
+        return tick_input
+
+    def save(self, path: Path, world_info: dict, final_state: dict):
+        """Zapisuje nagranie (gzip JSON); kolejne identyczne kroki zapisywane są jako jeden wpis z licznikiem"""
+        entries = []
+        for tick_input in self.ticks:
+            record = tick_input.to_record()
+            if entries and entries[-1][1:] == record and not record[4]:
+                entries[-1][0] += 1
+            else:
+                entries.append([1] + record)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump({
+                'version': RECORDING_VERSION,
+                'world_info': world_info,
+                'tick_count': len(self.ticks),
+                'ticks': entries,
+                'final_state': final_state
+            }, f)
+        print(f"Zapisano nagranie wejścia ({len(self.ticks)} kroków): {path}")
+
+
+def load_recording(path: Path) -> tuple[dict, list[TickInput]]:
+    """Wczytuje nagranie zapisane przez InputRecorder.save; zwraca dane nagrania i wejście kolejnych kroków"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        recording = json.load(f)
+
+    if recording.get('version', 0) > RECORDING_VERSION:
+        raise ValueError(f"Nieobsługiwana wersja nagrania: {recording.get('version')}")
+
+    ticks = []
+    for count, *record in recording['ticks']:
+        ticks.extend([TickInput.from_record(record)] * count)
+    return recording, ticks
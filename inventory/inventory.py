@@ -20,11 +20,11 @@ class Inventory:
         if item.quantity <= 0:
             self.slots[self.active_slot] = registry.create('empty', 0)
 
-    def input(self, event):
-        if event.key == pygame.K_RIGHT:
+    def input(self, key: int):
+        if key == pygame.K_RIGHT:
             if self.active_slot < len(self.slots) - 1:
                 self.active_slot += 1
-        if event.key == pygame.K_LEFT:
+        if key == pygame.K_LEFT:
             if self.active_slot > 0:
                 self.active_slot -= 1
 
@@ -2,11 +2,9 @@ from sprites.sprite import *
 
 
 class ItemData:
-    def __init__(self, name: str, quantity: int = 1, groups: list[str] = ['sprites', 'block_group'], use_type: Entity = Entity, item_type: None = None):
+    def __init__(self, name: str, quantity: int = 1, item_type: None = None):
         self.name = name
         self.quantity = quantity
-        self.groups = groups
-        self.use_type = use_type
         self.item_type = item_type or Item
 
 class Item:
@@ -29,17 +27,9 @@ class BlockItem(Item):
         if self.quantity <= 0:
             return
 
-        block_class = self.data.use_type
-        groups = [player.group_list[g] for g in self.data.groups]
-        # Stawianie bloku
-        block_class(
-            groups,
-            player.textures[self.name],
-            position,
-            self.name
-        )
-
-        self.quantity -= 1
+        # Stawianie bloku w siatce chunka
+        if player.world.place_block(position, self.name):
+            self.quantity -= 1
 
 class EmptyItem(Item):
     def use(self, *args, **kwargs):
@@ -1,12 +1,17 @@
 import sys
+import time
+import argparse
 import pygame
+from pathlib import Path
 
 from settings import *
 from game_manager import GameManager
+from profiler import profiler
+from input_source import LiveInput, InputRecorder
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, record_path: Path = None):
         pygame.init()
         pygame.display.set_caption(GAME_TITLE)
 
@@ -15,9 +20,18 @@ class Game:
         self.clock = pygame.time.Clock()
         self.running = True
 
+        # Wejście gracza odczytywane przez scenę raz na krok symulacji
+        self.input = LiveInput()
+        self.record_path = record_path
+
         self.game_manager = GameManager(self)
 
-        self.game_manager.set_state('loader_menu')
+        if record_path:
+            # Nagranie zaczyna się w nowym świecie z generacją synchroniczną, by dało się je odtworzyć
+            self.input = InputRecorder(self.input)
+            self._handle_game_manager_result(self.game_manager.create_new_world(synchronous_generation=True))
+        else:
+            self.game_manager.set_state('loader_menu')
 
     def handle_events(self):
         """Obsługuje wydarzenia systemowe i przekazuje je do GameManager"""
@@ -31,11 +45,21 @@ class Game:
                     self.running = False
                     return
 
+                # Profiler: F3 włącza nakładkę i pomiar, F4 zapisuje ślad (CSV i JSON)
+                if event.key == pygame.K_F3:
+                    profiler.toggle()
+                    continue
+                if event.key == pygame.K_F4 and profiler.enabled:
+                    trace_name = time.strftime('trace_%Y%m%d_%H%M%S')
+                    profiler.save_trace(Path('profiles', f'{trace_name}.csv'))
+                    profiler.save_trace(Path('profiles', f'{trace_name}.json'))
+                    continue
+
                 # Obsługa nawigacji w ekwipunku tylko gdy jesteśmy w grze
                 if (self.game_manager.get_current_state() == 'game' and
                         self.game_manager.scene and
                         (event.key == pygame.K_LEFT or event.key == pygame.K_RIGHT)):
-                    self.game_manager.scene.inventory.input(event)
+                    self.input.push_key(event.key)
                     continue
 
             result = self.game_manager.handle_event(event)
@@ -60,23 +84,26 @@ class Game:
             print(f"Błąd tworzenia świata: {error}")
 
     def update(self):
-        """Aktualizuje stan gry"""
-        self.handle_events()
+        """Wykonuje jeden krok symulacji gry"""
         self.game_manager.update()
-        pygame.display.update()
 
-    def draw(self):
-        """Rysuje aktualny stan gry"""
-        self.screen.fill('lightblue')
-        self.game_manager.draw()
+    def draw(self, alpha: float = 1.0):
+        """Rysuje aktualny stan gry i wyświetla klatkę"""
+        self.game_manager.draw(alpha)
+        profiler.draw(self.screen)
         pygame.display.flip()
 
     def close(self):
         """Zamyka grę i zapisuje dane"""
         if (self.game_manager.get_current_state() == 'game' and
                 self.game_manager.scene):
+            scene = self.game_manager.scene
+            if self.record_path:
+                self.input.save(self.record_path, scene.get_world_info(), scene.get_simulation_state())
+
             try:
-                self.game_manager.scene.save_world_data()
+                # Zapis i zatrzymanie procesów roboczych sceny przed zamknięciem procesu
+                scene.close()
                 print("Dane gry zostały zapisane przed zamknięciem")
             except:
                 print("Błąd podczas zapisywania danych")
@@ -94,16 +121,32 @@ class Game:
         self.game_manager.set_state('loader_menu')
 
     def run(self):
+        # Symulacja w stałych krokach SIMULATION_DT, niezależnie od liczby klatek renderowania
+        accumulator = 0.0
         while self.running:
-            DT = get_DT(self.clock) / 60
+            accumulator += min(self.clock.tick(FPS) / 1000, MAX_FRAME_TIME)
+            profiler.begin_frame()
 
-            self.update()
-            self.draw()
+            with profiler.section('events'):
+                self.handle_events()
+            with profiler.section('simulation'):
+                while accumulator >= SIMULATION_DT:
+                    self.update()
+                    accumulator -= SIMULATION_DT
+
+            # Rysowanie z interpolacją pozycji między dwoma ostatnimi krokami symulacji
+            with profiler.section('draw'):
+                self.draw(accumulator / SIMULATION_DT)
+            profiler.end_frame()
 
         self.close()
 
 
 # Uruchomienie gry
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description=GAME_TITLE)
+    parser.add_argument('--record', type=Path, help='nagrywa wejście w nowym świecie do pliku (np. recordings/tunel.rec)')
+    args = parser.parse_args()
+
+    game = Game(args.record)
     game.run()
\ No newline at end of file
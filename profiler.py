@@ -0,0 +1,145 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+import pygame
+
+from settings import PROFILER_WINDOW, PROFILER_TRACE_LIMIT
+
+
+class _Section:
+    """Mierzy czas bloku kodu i dolicza go do sekcji bieżącej klatki"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        current = self.profiler.current_frame
+        current[self.name] = current.get(self.name, 0.0) + elapsed
+
+
+class Profiler:
+    """Opcjonalny profiler klatek: czasy sekcji (np. aktualizacja sprite'ów, strumieniowanie chunków,
+    rysowanie) sumowane w obrębie klatki, kroczące percentyle i zapis śladu do CSV/JSON"""
+
+    def __init__(self, window: int = PROFILER_WINDOW, trace_limit: int = PROFILER_TRACE_LIMIT):
+        self.enabled = False
+        self.window = window
+
+        # Czasy sekcji bieżącej klatki [s], ostatnie `window` klatek dla percentyli i ślad do zapisu
+        self.current_frame: dict[str, float] = {}
+        self.history: dict[str, deque] = {}
+        self.trace: deque = deque(maxlen=trace_limit)
+        self.frame_start = 0.0
+        self.frame_number = 0
+
+        self.font = None
+        self.overlay_lines: list[tuple[str, ...]] = []
+        self.overlay_refresh_time = 0.0
+
+    def toggle(self):
+        """Włącza lub wyłącza profilowanie (i nakładkę), czyszcząc zebrane dane przy włączeniu"""
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.history.clear()
+            self.trace.clear()
+            self.overlay_lines = []
+            # Włączenie w trakcie klatki (np. klawiszem) - pomiar liczony od tej chwili
+            self.current_frame = {}
+            self.frame_start = time.perf_counter()
+
+    def section(self, name: str):
+        """Zwraca kontekst mierzący czas sekcji; przy wyłączonym profilerze nic nie mierzy"""
+        if not self.enabled:
+            return nullcontext()
+        return _Section(self, name)
+
+    def begin_frame(self):
+        if self.enabled:
+            self.current_frame = {}
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Zamyka klatkę: zapisuje czasy sekcji do historii i śladu"""
+        if not self.enabled:
+            return
+
+        self.current_frame['frame'] = time.perf_counter() - self.frame_start
+        for name, elapsed in self.current_frame.items():
+            if name not in self.history:
+                self.history[name] = deque(maxlen=self.window)
+            self.history[name].append(elapsed)
+
+        self.frame_number += 1
+        self.trace.append((self.frame_number, self.current_frame))
+        self.current_frame = {}
+
+    def get_stats(self) -> dict[str, dict[str, float]]:
+        """Zwraca p50/p95/p99 i maksimum czasów sekcji [ms] z ostatnich klatek"""
+        stats = {}
+        for name, samples in self.history.items():
+            values = np.array(samples) * 1000
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]).tolist()
+            stats[name] = {'p50': p50, 'p95': p95, 'p99': p99, 'max': float(values.max())}
+        return stats
+
+    def save_trace(self, path: Path):
+        """Zapisuje ślad klatek: CSV (wiersz na klatkę, kolumna na sekcję) lub JSON (klatki i percentyle)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sections = sorted({name for _, frame in self.trace for name in frame})
+
+        if path.suffix == '.csv':
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['frame'] + [f'{name}_ms' for name in sections])
+                for number, frame in self.trace:
+                    writer.writerow([number] + [f"{frame.get(name, 0.0) * 1000:.4f}" for name in sections])
+        else:
+            with open(path, 'w') as f:
+                json.dump({
+                    'stats_ms': self.get_stats(),
+                    'frames': [{'frame': number, **{name: elapsed * 1000 for name, elapsed in frame.items()}}
+                               for number, frame in self.trace]
+                }, f, indent=1)
+        print(f"Zapisano ślad profilera: {path}")
+
+    def draw(self, screen: pygame.Surface):
+        """Rysuje nakładkę z percentylami czasów sekcji (odświeżaną kilka razy na sekundę)"""
+        if not self.enabled:
+            return
+
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+
+        current_time = time.perf_counter()
+        if current_time - self.overlay_refresh_time > 0.25:
+            self.overlay_refresh_time = current_time
+            self.overlay_lines = [('sekcja [ms]', 'p50', 'p95', 'p99')]
+            for name, stat in sorted(self.get_stats().items()):
+                self.overlay_lines.append((name, f"{stat['p50']:.2f}", f"{stat['p95']:.2f}", f"{stat['p99']:.2f}"))
+
+        line_height = self.font.get_linesize()
+        x, y = screen.get_width() - 330, 10
+        background = pygame.Surface((320, line_height * len(self.overlay_lines) + 10), pygame.SRCALPHA)
+        background.fill((0, 0, 0, 160))
+        screen.blit(background, (x - 5, y - 5))
+        for i, (name, *values) in enumerate(self.overlay_lines):
+            screen.blit(self.font.render(name, True, 'white'), (x, y + i * line_height))
+            # Wartości wyrównane do prawej krawędzi kolumn
+            for column, value in enumerate(values):
+                text = self.font.render(value, True, 'white')
+                screen.blit(text, (x + 200 + column * 50 - text.get_width(), y + i * line_height))
+
+
+# Globalny profiler
+profiler = Profiler()
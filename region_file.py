@@ -0,0 +1,175 @@
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Optional, Callable, TypeVar
+
+from settings import REGION_SIZE
+from compression import COMPRESSION_ZLIB, compress, decompress
+
+# Nagłówek: sygnatura, wersja formatu, kodek i poziom kompresji, a po nim tablica (przesunięcie, długość)
+# dla każdego chunka regionu. Pliki w wersji 1 nie zapisywały kodeka i używały zlib
+REGION_MAGIC = b'TFTR'
+REGION_VERSION = 2
+HEADER = struct.Struct('<4sBBBx')
+ENTRY = struct.Struct('<II')
+CHUNKS_PER_REGION = REGION_SIZE * REGION_SIZE
+DATA_START = HEADER.size + ENTRY.size * CHUNKS_PER_REGION
+# Region z nieużywanymi danymi (nadpisane wersje chunków) jest przepisywany, gdy zajmują one
+# więcej niż dane chunków, ale nie wcześniej niż po tylu bajtach
+MIN_COMPACT_SIZE = 64 * 1024
+
+T = TypeVar('T')
+
+
+class RegionFile:
+    """Plik regionu REGION_SIZE x REGION_SIZE chunków z niezależnie skompresowanymi danymi każdego chunka"""
+
+    def __init__(self, path: Path, compression: int = COMPRESSION_ZLIB, compression_level: int = 6):
+        self.path = path
+        # Kodek, którym skompresowane są dane w pliku, oraz kodek i poziom używane przy zapisie
+        self.file_compression = compression
+        self.compression = compression
+        self.compression_level = compression_level
+        # (przesunięcie, długość) danych chunka w pliku; długość 0 oznacza brak chunka
+        self.entries: list[tuple[int, int]] = [(0, 0)] * CHUNKS_PER_REGION
+        # Odczyty z wątku głównego nie mogą trafić między podmianę pliku a aktualizację tablicy przesunięć
+        self.lock = threading.Lock()
+        # Plik zmapowany w pamięci przy pierwszym odczycie, zamykany przed podmianą pliku
+        self.mapped: Optional[mmap.mmap] = None
+
+        if self.path.exists():
+            self._read_header()
+
+    @staticmethod
+    def region_pos(chunk_pos: tuple[int, int]) -> tuple[int, int]:
+        """Zwraca pozycję regionu zawierającego chunk"""
+        return chunk_pos[0] // REGION_SIZE, chunk_pos[1] // REGION_SIZE
+
+    @staticmethod
+    def chunk_index(chunk_pos: tuple[int, int]) -> int:
+        """Zwraca indeks chunka w tablicy przesunięć regionu"""
+        return (chunk_pos[1] % REGION_SIZE) * REGION_SIZE + chunk_pos[0] % REGION_SIZE
+
+    def _read_header(self):
+        """Wczytuje tablicę przesunięć bez czytania danych chunków"""
+        with open(self.path, 'rb') as f:
+            header = f.read(DATA_START)
+
+        magic, version, compression, _ = HEADER.unpack_from(header)
+        if magic != REGION_MAGIC or version > REGION_VERSION:
+            raise ValueError(f"Nieobsługiwany plik regionu: {self.path}")
+        self.file_compression = compression if version >= 2 else COMPRESSION_ZLIB
+        self.entries = list(ENTRY.iter_unpack(header[HEADER.size:]))
+
+    def has_chunk(self, chunk_pos: tuple[int, int]) -> bool:
+        """Sprawdza, czy region zawiera dane chunka"""
+        return self.entries[self.chunk_index(chunk_pos)][1] > 0
+
+    def chunk_count(self) -> int:
+        """Zwraca liczbę chunków zapisanych w regionie"""
+        return sum(1 for _, length in self.entries if length)
+
+    def read_chunk(self, chunk_pos: tuple[int, int], decode: Callable[[memoryview], T] = bytes) -> Optional[T]:
+        """Przekazuje zdekompresowane dane jednego chunka z zmapowanego pliku do decode.
+        Bez kompresji decode dostaje widok pliku bez kopiowania, ważny tylko w trakcie wywołania"""
+        with self.lock:
+            offset, length = self.entries[self.chunk_index(chunk_pos)]
+            if not length:
+                return None
+
+            if self.mapped is None:
+                with open(self.path, 'rb') as f:
+                    self.mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with memoryview(self.mapped)[offset:offset + length] as view:
+                return decode(decompress(view, self.file_compression))
+
+    def close(self):
+        """Zamyka mapowanie pliku"""
+        with self.lock:
+            self._close_map()
+
+    def _close_map(self):
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+
+    def write_chunks(self, payloads: dict[tuple[int, int], Optional[bytes]]):
+        """Kompresuje i zapisuje dane podanych chunków (None usuwa chunk). Zapisy muszą pochodzić z jednego wątku naraz.
+
+        Nowe dane dopisywane są na końcu pliku, a w nagłówku zmieniane są tylko wpisy zapisanych chunków,
+        więc koszt zapisu zależy od liczby zmienionych chunków, a nie od rozmiaru regionu. Cały plik
+        przepisywany jest tylko przy tworzeniu, zmianie kodeka i gdy nieużywane dane zajmują więcej niż dane chunków
+        """
+        updates = {self.chunk_index(chunk_pos): payload and compress(payload, self.compression, self.compression_level)
+                   for chunk_pos, payload in payloads.items()}
+
+        if not self.path.exists() or self.file_compression != self.compression:
+            self._rewrite(updates)
+            return
+
+        # Nowe dane trafiają za koniec pliku, a wpisy usuniętych chunków są zerowane
+        entries = list(self.entries)
+        end = offset = self.path.stat().st_size
+        for index, payload in updates.items():
+            entries[index] = (offset, len(payload)) if payload else (0, 0)
+            offset += len(payload) if payload else 0
+
+        if offset - DATA_START > 2 * max(sum(length for _, length in entries), MIN_COMPACT_SIZE):
+            self._rewrite(updates)
+            return
+
+        with open(self.path, 'r+b') as f:
+            # Dane dopisywane za dotychczasowymi, więc przerwany zapis zostawia poprawny stary nagłówek
+            f.seek(end)
+            f.write(b''.join(payload for payload in updates.values() if payload))
+            f.flush()
+            os.fsync(f.fileno())
+
+            with self.lock:
+                # Mapowanie obejmuje stary rozmiar pliku; następny odczyt zmapuje plik ponownie
+                self._close_map()
+                f.seek(0)
+                f.write(HEADER.pack(REGION_MAGIC, REGION_VERSION, self.compression, self.compression_level))
+                f.write(b''.join(ENTRY.pack(*entry) for entry in entries))
+                f.flush()
+                os.fsync(f.fileno())
+                self.entries = entries
+
+    def _rewrite(self, updates: dict[int, Optional[bytes]]):
+        """Zapisuje cały region od nowa bez nieużywanych danych. Pozostałe chunki są kopiowane
+        bez dekompresji, chyba że plik używa innego kodeka"""
+        old_data = self.path.read_bytes() if self.path.exists() else b''
+        transcode = self.file_compression != self.compression
+
+        entries = []
+        chunks = []
+        offset = DATA_START
+        for index, (old_offset, old_length) in enumerate(self.entries):
+            if index in updates:
+                payload = updates[index] or b''
+            else:
+                payload = old_data[old_offset:old_offset + old_length]
+                if transcode and payload:
+                    payload = compress(decompress(payload, self.file_compression),
+                                       self.compression, self.compression_level)
+            entries.append((offset, len(payload)) if payload else (0, 0))
+            chunks.append(payload)
+            offset += len(payload)
+
+        # Zapis do pliku tymczasowego i podmiana, by przerwany zapis nie uszkodził regionu
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(REGION_MAGIC, REGION_VERSION, self.compression, self.compression_level))
+            f.write(b''.join(ENTRY.pack(*entry) for entry in entries))
+            f.write(b''.join(chunks))
+            f.flush()
+            os.fsync(f.fileno())
+
+        with self.lock:
+            # Mapowanie starego pliku musi być zamknięte przed podmianą (wymóg Windows)
+            self._close_map()
+            os.replace(temp_path, self.path)
+            self.entries = entries
+            self.file_compression = self.compression
@@ -1,32 +1,42 @@
-import random
-from chunk import Chunk
 from pathlib import Path
-import time
-from collections import deque
+import hashlib
+from concurrent.futures import Future
+from typing import Optional
 import numpy as np
-from opensimplex import OpenSimplex
 
 from inventory.inventory import Inventory
 from sprites.player import Player
-from texture_data import atlas_texture_data, solo_texture_data
+from texture_data import atlas_texture_data, solo_texture_data, block_names, block_ids, AIR
 from sprites.camera import Camera
+from sprites.sprite_cache import sprite_cache
+from profiler import profiler
 from inventory.items import *
 from world_manager import WorldManager
+from chunk_codec import encode_tiles
+from world_generator import WorldGenerator, ChunkGenerationService
 
 
 class Scene:
-    def __init__(self, app, world_name: str = 'default_world', save_path: Path = None) -> None:
+    def __init__(self, app, world_name: str = 'default_world', save_path: Path = None,
+                 synchronous_generation: bool = False) -> None:
         self.app = app
         self.game_version = '0.2.0'
         self.sprites = Camera()
-        self.blocks = pygame.sprite.Group()
-        self.group_list: dict[str, pygame.sprite.Group] = {
-            'sprites': self.sprites,
-            'block_group': self.blocks
-        }
 
         # Zasięg renderowania chunków
         self.chunk_render_distance = 3
+        # Budżet pamięci nieaktywnych chunków (tylko siatki bloków, ok. 900 B na chunk - powierzchnie mają
+        # tylko chunki aktywne). Po jego przekroczeniu chunki dalej niż zasięg renderowania + margines
+        # są usuwane z pamięci (od najdalszych), aż zajętość spadnie do low_watermark budżetu
+        self.chunk_evict_margin = 2
+        self.chunk_memory_budget = 256 * 1024
+        self.chunk_memory_low_watermark = 0.75
+        self.memory_check_interval = 1
+        self.last_memory_check = 0.0
+
+        # Czas symulacji: liczba wykonanych kroków; okresowe zadania sceny odmierzane są w krokach,
+        # więc przebieg symulacji zależy tylko od wejścia gracza, a nie od czasu rzeczywistego
+        self.tick = 0
 
         # Wczytanie tekstur
         self.atlas_textures = self.gen_atlas_textures('Assets/blocks/atlas.png')
@@ -41,27 +51,32 @@ class Scene:
         # Seed z world managera
         world_info = self.world_manager.get_world_info()
         self.world_seed = world_info['seed']
+        self.world_generator = WorldGenerator(self.world_seed)
 
         # Stworzenie gracza
         self.player = Player([self.sprites], 0, 0, parameters={
-            'textures': self.atlas_textures, 'group_list': self.group_list, 'inventory': self.inventory})
+            'inventory': self.inventory, 'world': self})
 
         # Stworzenie moba
         Mob([self.sprites],
-            pygame.transform.scale(pygame.image.load('Assets/mobs/zombie.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)),
-            (200, 400), parameters={'block_group': self.blocks, 'player': self.player, 'speed': 5})
+            self.solo_textures['zombie_static'],
+            (200, 400), parameters={'world': self, 'player': self.player, 'speed': 5})
 
         # Generacja świata
         self.chunks: dict[tuple[int, int], Chunk] = {}
         self.active_chunks: dict[tuple[int, int], Chunk] = {}
 
-        # Asynchroniczne ładowanie chunków
-        self.chunk_load_queue = deque()
+        # Generowanie nowych chunków w tle; synchronicznie (jeden chunk na krok) przy nagrywaniu
+        # i odtwarzaniu wejścia, by moment dołączenia chunka nie zależał od szybkości procesów roboczych
+        self.generation_service = ChunkGenerationService(self.world_generator, synchronous=synchronous_generation)
+        self.max_chunks_per_frame = 2
 
-        # Automatyczne zapisywanie co 30 sekund
-        self.last_save_time = time.time()
+        # Automatyczne zapisywanie co 30 sekund w wątku zapisu WorldManagera
+        self.last_save_time = 0.0
         self.auto_save_interval = 30
 
+        self.closed = False
+
     def _initialize_world_manager(self, world_name: str = None, save_path: Path = None) -> WorldManager:
         """Inicjalizuje WorldManager"""
         if save_path:
@@ -77,28 +92,38 @@ class Scene:
         return cls(app, save_path=save_path)
 
     @classmethod
-    def create_new_world(cls, app, world_name: str = None):
+    def create_new_world(cls, app, world_name: str = None, synchronous_generation: bool = False):
         """Tworzy nowy świat"""
-        return cls(app, world_name=world_name)
+        return cls(app, world_name=world_name, synchronous_generation=synchronous_generation)
 
-    def load_chunk_data(self, chunk_pos: tuple[int, int]) -> dict:
-        """Wczytuje dane chunka przez WorldManager"""
+    def load_chunk_data(self, chunk_pos: tuple[int, int]) -> Optional[np.ndarray]:
+        """Wczytuje siatkę bloków chunka przez WorldManager"""
         return self.world_manager.load_chunk_data(chunk_pos)
 
-    def save_world_data(self):
-        """Zapisuje wszystkie dane świata przez WorldManager"""
-        self.world_manager.save_world_data(self.chunks)
+    def get_dirty_chunks(self) -> dict[tuple[int, int], 'Chunk']:
+        """Zwraca chunki zmienione od ostatniego zapisu"""
+        return {pos: chunk for pos, chunk in self.chunks.items() if chunk.dirty}
+
+    def save_world_data(self) -> Future:
+        """Zleca zapis zmienionych chunków i metadanych świata przez WorldManager"""
+        dirty_chunks = self.get_dirty_chunks()
+        future = self.world_manager.save_world_data(dirty_chunks)
+
+        # Dane chunków są już skopiowane do zapisu; nieudany zapis WorldManager ponawia przy następnym
+        # zleceniu, także dla chunków usuniętych w międzyczasie z pamięci sceny
+        for chunk in dirty_chunks.values():
+            chunk.dirty = False
+        return future
 
     def gen_solo_textures(self, file_path):
         textures = {}
         for name, data in solo_texture_data.items():
-            textures[name] = pygame.transform.scale(pygame.image.load(data['file_path']).convert_alpha(), data['size'])
+            textures[name] = sprite_cache.get_image(data['file_path'], data['size'])
         return textures
 
     def gen_atlas_textures(self, file_path):
         textures = {}
-        atlas_img = pygame.transform.scale(pygame.image.load(file_path).convert_alpha(),
-                                           (TILE_SIZE * 16, TILE_SIZE * 16))
+        atlas_img = sprite_cache.get_image(file_path, (TILE_SIZE * 16, TILE_SIZE * 16))
 
         for name, data in atlas_texture_data.items():
             textures[name] = pygame.Surface.subsurface(atlas_img, pygame.Rect(data['position'][0] * TILE_SIZE,
@@ -124,48 +149,74 @@ class Scene:
         return sorted(positions, key=distance_to_player)
 
     def update(self):
-        self.sprites.update()
-        self.player.update_animation()
-        self.inventory.update()
+        """Wykonuje jeden krok symulacji o stałej długości SIMULATION_DT"""
+        self.tick += 1
+
+        # Wejście gracza odczytywane raz na krok (z klawiatury i myszy albo z nagrania)
+        controls = self.app.input.read_tick()
+        for key in controls.key_presses:
+            self.inventory.input(key)
+        self.player.controls = controls
+
+        with profiler.section('sprites'):
+            self.sprites.store_positions()
+            self.sprites.update()
+            self.player.update_animation()
+            self.inventory.update()
 
         player_chunk_pos = Chunk.get_chunk_pos(self.player.rect.center)
 
+        with profiler.section('streaming'):
+            positions = self.stream_chunks(player_chunk_pos)
+
+        with profiler.section('unload'):
+            self.unload_chunks(player_chunk_pos, positions)
+
+        # Automatyczne zapisywanie: tylko zmienione chunki, zapis na dysk w tle
+        current_time = self.get_simulation_time()
+        if current_time - self.last_save_time > self.auto_save_interval:
+            with profiler.section('autosave'):
+                self.save_world_data()
+            self.last_save_time = current_time
+
+    def stream_chunks(self, player_chunk_pos: tuple[int, int]) -> list[tuple[int, int]]:
+        """Aktywuje, wczytuje i zleca generację chunków w zasięgu renderowania, zwraca ich pozycje"""
         # Generuj pozycje chunków w zasięgu renderowania
         positions = self.get_chunks_in_range(player_chunk_pos, self.chunk_render_distance)
         positions = self.get_chunks_by_priority(player_chunk_pos, positions)
 
+        # Chunk gracza potrzebny jest od razu (np. tuż po wczytaniu świata), inaczej gracz spadłby w pustkę
+        if player_chunk_pos not in self.chunks:
+            self.attach_chunk(player_chunk_pos)
+
         chunks_loaded_this_frame = 0
-        max_chunks_per_frame = 2
+        to_generate = []
 
         for position in positions:
-            if position not in self.active_chunks:
-                if chunks_loaded_this_frame >= max_chunks_per_frame:
-                    if position not in self.chunk_load_queue:
-                        self.chunk_load_queue.append(position)
-                    continue
-
-                if position in self.chunks:
-                    self.chunks[position].load_chunk()
-                    self.active_chunks[position] = self.chunks[position]
-                else:
-                    self.chunks[position] = Chunk(position, self.group_list, self.atlas_textures, self.world_seed, self)
-                    self.active_chunks[position] = self.chunks[position]
+            if position in self.active_chunks:
+                continue
 
+            if position in self.chunks:
+                self.active_chunks[position] = self.chunks[position]
+            elif self.generation_service.is_pending(position) or not self.world_manager.has_chunk_data(position):
+                to_generate.append(position)
+            elif chunks_loaded_this_frame < self.max_chunks_per_frame:
+                # Zapisane chunki wczytywane są od razu, z limitem na klatkę
+                self.attach_chunk(position)
                 chunks_loaded_this_frame += 1
 
-        # Przetworzenie kolejki ładowania chunków
-        while self.chunk_load_queue and chunks_loaded_this_frame < max_chunks_per_frame:
-            position = self.chunk_load_queue.popleft()
-            if position not in self.active_chunks and position in positions:
-                if position in self.chunks:
-                    self.chunks[position].load_chunk()
-                    self.active_chunks[position] = self.chunks[position]
-                else:
-                    self.chunks[position] = Chunk(position, self.group_list, self.atlas_textures, self.world_seed, self)
-                    self.active_chunks[position] = self.chunks[position]
-                chunks_loaded_this_frame += 1
+        # Zlecenie generacji w kolejności priorytetu; chunki poza zasięgiem są anulowane
+        self.generation_service.request(to_generate)
+
+        # Dołączenie chunków wygenerowanych w tle
+        for position, tiles in self.generation_service.poll(self.max_chunks_per_frame):
+            if position not in self.chunks:
+                self.attach_chunk(position, tiles, activate=position in positions)
 
-        # Rozładowywanie chunków poza zasięgiem
+        return positions
+
+    def unload_chunks(self, player_chunk_pos: tuple[int, int], positions: list[tuple[int, int]]):
+        """Rozładowuje chunki spoza zasięgu i pilnuje budżetu pamięci chunków"""
         chunks_to_unload = [pos for pos, chunk in self.active_chunks.items() if pos not in positions]
 
         # Ograniczenie rozładowywania chunków na klatkę
@@ -173,19 +224,107 @@ class Scene:
         for i, pos in enumerate(chunks_to_unload):
             if i >= max_unload_per_frame:
                 break
-            self.active_chunks[pos].unload_chunk()
-            self.active_chunks.pop(pos)
+            self.active_chunks.pop(pos).unload_chunk()
+
+        # Kontrola budżetu pamięci chunków
+        current_time = self.get_simulation_time()
+        if current_time - self.last_memory_check > self.memory_check_interval:
+            self.evict_far_chunks(player_chunk_pos)
+            self.last_memory_check = current_time
+
+    def get_simulation_time(self) -> float:
+        """Zwraca czas symulacji w sekundach"""
+        return self.tick * SIMULATION_DT
+
+    def get_simulation_state(self) -> dict:
+        """Zwraca stan symulacji do porównania przebiegów (gracz, moby, ekwipunek i skrót siatek chunków)"""
+        tiles_hash = hashlib.sha256()
+        for position in sorted(self.chunks):
+            tiles_hash.update(repr(position).encode())
+            tiles_hash.update(self.chunks[position].tiles.tobytes())
+
+        return {
+            'tick': self.tick,
+            'player': {
+                'rect': list(self.player.rect),
+                'velocity': list(self.player.velocity),
+                'is_grounded': self.player.is_grounded
+            },
+            'mobs': [list(sprite.rect) for sprite in self.sprites.sprites() if sprite is not self.player],
+            'inventory': {
+                'active_slot': self.inventory.active_slot,
+                'slots': [[item.name, item.quantity] for item in self.inventory.slots]
+            },
+            'chunks': len(self.chunks),
+            'chunks_hash': tiles_hash.hexdigest()
+        }
 
-        # Automatyczne zapisywanie
-        current_time = time.time()
-        if current_time - self.last_save_time > self.auto_save_interval:
-            self.save_world_data()
-            self.last_save_time = current_time
+    def get_resident_bytes(self) -> int:
+        """Zwraca pamięć zajmowaną przez chunki sceny (siatki bloków i wyrenderowane powierzchnie)"""
+        return sum(chunk.get_memory_size() for chunk in self.chunks.values())
 
-    def draw(self):
+    def get_evictable_bytes(self) -> int:
+        """Zwraca pamięć chunków nieaktywnych, które mogą zostać usunięte z pamięci sceny"""
+        return sum(chunk.get_memory_size() for pos, chunk in self.chunks.items() if pos not in self.active_chunks)
+
+    def evict_far_chunks(self, center_pos: tuple[int, int]):
+        """Po przekroczeniu budżetu pamięci nieaktywnych chunków usuwa najdalsze chunki spoza zasięgu
+        renderowania + marginesu. Zmienione trafiają do zapisu, pozostałe do cache WorldManagera w zakodowanej postaci"""
+        evictable_bytes = self.get_evictable_bytes()
+        if evictable_bytes <= self.chunk_memory_budget:
+            return
+
+        def distance(pos):
+            return max(abs(pos[0] - center_pos[0]), abs(pos[1] - center_pos[1]))
+
+        # Margines między zasięgiem renderowania a usuwaniem zapobiega ciągłemu wczytywaniu i usuwaniu chunków na granicy
+        evict_distance = self.chunk_render_distance + self.chunk_evict_margin
+        far_positions = sorted((pos for pos in self.chunks if distance(pos) > evict_distance and pos not in self.active_chunks),
+                               key=distance, reverse=True)
+
+        target_bytes = self.chunk_memory_budget * self.chunk_memory_low_watermark
+        dirty_chunks = {}
+        for pos in far_positions:
+            if evictable_bytes <= target_bytes:
+                break
+            chunk = self.chunks.pop(pos)
+            evictable_bytes -= chunk.get_memory_size()
+
+            # Dane zmienionych chunków trafiają do zapisu; do czasu zapisu WorldManager wczytuje je z pamięci
+            if chunk.dirty:
+                dirty_chunks[pos] = chunk
+            else:
+                self.world_manager.cache_chunk(pos, chunk.tiles)
+
+        if dirty_chunks:
+            self.world_manager.save_chunks(dirty_chunks)
+
+    def get_memory_stats(self) -> dict:
+        """Zwraca liczbę i rozmiar chunków w pamięci sceny oraz stan pamięci WorldManagera"""
+        return {
+            'resident_chunks': len(self.chunks),
+            'active_chunks': len(self.active_chunks),
+            'rendered_chunks': sum(1 for chunk in self.chunks.values() if chunk.surface),
+            'resident_bytes': self.get_resident_bytes(),
+            'evictable_bytes': self.get_evictable_bytes(),
+            'memory_budget': self.chunk_memory_budget,
+            'pending_save_chunks': len(self.world_manager.pending_chunks),
+            'chunk_cache': self.world_manager.chunk_cache.get_stats()
+        }
+
+    def attach_chunk(self, position: tuple[int, int], tiles: np.ndarray = None, activate: bool = True):
+        """Tworzy chunk (z gotowej siatki lub z zapisu) i dołącza go do świata"""
+        self.chunks[position] = Chunk(position, self.atlas_textures, self, tiles)
+        if activate:
+            self.active_chunks[position] = self.chunks[position]
+
+    def draw(self, alpha: float = 1.0):
+        """Rysuje scenę; alpha to ułamek kroku symulacji, który upłynął od ostatniej aktualizacji"""
         self.app.screen.fill('lightblue')
-        self.sprites.draw(self.player, self.app.screen)
-        self.inventory.draw()
+        with profiler.section('camera_draw'):
+            self.sprites.draw(self.player, self.app.screen, self.active_chunks.values(), alpha)
+        with profiler.section('inventory_draw'):
+            self.inventory.draw()
 
     def set_render_distance(self, distance: int):
         """Pozwala na dynamiczną zmianę zasięgu renderowania (niezaimplementowane)"""
@@ -200,232 +339,149 @@ class Scene:
         """Zwraca informacje o aktualnym świecie"""
         return self.world_manager.get_world_info()
 
-    def __del__(self):
-        """Zapisz dane przy zamykaniu"""
+    def get_block_rects(self, rect: pygame.Rect) -> list[pygame.Rect]:
+        """Zwraca prostokąty bloków z załadowanych chunków nachodzących na podany obszar"""
+        rects = []
+        for tile_y in range(rect.top // TILE_SIZE, (rect.bottom - 1) // TILE_SIZE + 1):
+            for tile_x in range(rect.left // TILE_SIZE, (rect.right - 1) // TILE_SIZE + 1):
+                chunk = self.active_chunks.get((tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE))
+                if chunk and chunk.tiles[tile_y % CHUNK_SIZE, tile_x % CHUNK_SIZE] != AIR:
+                    rects.append(pygame.Rect(tile_x * TILE_SIZE, tile_y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+        return rects
+
+    @staticmethod
+    def world_to_tile(world_pos: tuple) -> tuple[tuple[int, int], tuple[int, int]]:
+        """Zamienia pozycję w świecie na pozycję chunka i lokalne indeksy kafelka (kolumna, wiersz)"""
+        tile_x, tile_y = int(world_pos[0] // TILE_SIZE), int(world_pos[1] // TILE_SIZE)
+        return (tile_x // CHUNK_SIZE, tile_y // CHUNK_SIZE), (tile_x % CHUNK_SIZE, tile_y % CHUNK_SIZE)
+
+    def get_block(self, world_pos: tuple) -> Optional[str]:
+        """Zwraca nazwę bloku w podanej pozycji świata (None, gdy chunk nie jest załadowany)"""
+        chunk_pos, (column, row) = self.world_to_tile(world_pos)
+        chunk = self.active_chunks.get(chunk_pos)
+        if not chunk:
+            return None
+        return block_names[chunk.get_block(column, row)]
+
+    def set_block(self, world_pos: tuple, name: str) -> bool:
+        """Ustawia blok w podanej pozycji świata, zwraca False gdy chunk nie jest załadowany"""
+        chunk_pos, (column, row) = self.world_to_tile(world_pos)
+        chunk = self.active_chunks.get(chunk_pos)
+        if not chunk:
+            return False
+        chunk.set_block(column, row, block_ids[name])
+        return True
+
+    def remove_block(self, world_pos: tuple) -> Optional[str]:
+        """Usuwa blok z podanej pozycji świata i zwraca jego nazwę (None, gdy nie było czego usunąć)"""
+        name = self.get_block(world_pos)
+        if name is None or name == 'air':
+            return None
+        self.set_block(world_pos, 'air')
+        return name
+
+    def place_block(self, world_pos: tuple, name: str) -> bool:
+        """Stawia blok w pustym miejscu załadowanego chunka, zwraca True gdy się udało"""
+        if self.get_block(world_pos) != 'air':
+            return False
+        return self.set_block(world_pos, name)
+
+    def close(self):
+        """Zapisuje zmienione chunki, zatrzymuje pulę generacji i zamyka WorldManager (wątek zapisu i pliki regionów).
+
+        Scena jest w cyklu referencji (gracz i moby trzymają ją jako świat), więc procesy robocze
+        nie mogą czekać na odśmiecanie - close wywołują Game.close i powrót do menu.
+        """
+        if self.closed:
+            return
+        self.closed = True
+
+        self.generation_service.shutdown()
         try:
-            self.save_world_data()
-        except:
-            pass
+            self.save_world_data().result()
+        finally:
+            self.world_manager.close()
 
 
 class Chunk:
-    def __init__(self, position: tuple[int, int], group_list: dict[str, pygame.sprite.Group],
-                 textures: dict[str, pygame.Surface], world_seed: int, scene):
+    def __init__(self, position: tuple[int, int], textures: dict[str, pygame.Surface], scene,
+                 tiles: np.ndarray = None):
         self.position = position
-        self.group_list = group_list
         self.textures = textures
-        self.world_seed = world_seed
         self.scene = scene
-        self.blocks: list[Entity] = []
-        self.noise_generator = OpenSimplex(seed=world_seed)
 
-        # Próba wczytania zapisanego chunka
-        saved_data = self.scene.load_chunk_data(position)
-        if saved_data:
-            self.load_from_data(saved_data)
-        else:
-            self.gen_chunk()
-
-    def load_from_data(self, data: dict):
-        """Wczytuje chunk z zapisanych danych"""
-        for block_info in data.get('blocks', []):
-            name = block_info['name']
-            x = block_info['x']
-            y = block_info['y']
-
-            if name and name != 'air':
-                try:
-                    item_data = registry.get_data(name)
-                    use_type = item_data.use_type
-                    groups = [self.group_list[group] for group in item_data.groups]
-                    block = use_type(groups, self.textures[name], (x, y), name)
-                    self.blocks.append(block)
-                except KeyError:
-                    continue
-
-    def get_save_data(self):
-        """Zwraca dane chunka do zapisu"""
-        data = {
-            'position': self.position,
-            'blocks': []
-        }
+        # Siatka identyfikatorów bloków indeksowana [wiersz, kolumna], wiersz 0 to górna krawędź chunka
+        self.tiles = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=np.uint8)
+        self.rect = pygame.Rect(position[0] * CHUNK_PIXEL_SIZE, position[1] * CHUNK_PIXEL_SIZE,
+                                CHUNK_PIXEL_SIZE, CHUNK_PIXEL_SIZE)
 
-        for block in self.blocks:
-            data['blocks'].append({
-                'name': block.name,
-                'x': block.rect.x,
-                'y': block.rect.y
-            })
-
-        return data
-
-    def initialize_underground_chunk(self, chunk_data):
-        height = len(chunk_data)
-        width = len(chunk_data[0])
-        for x in range(height):
-            for y in range(width):
-                if random.random() <= CELLAUT_CHANCE_TO_STAY_ALIVE:
-                    chunk_data[y][x] = 'stone'
-        return chunk_data
-
-    def count_alive_neighbors(self, chunk_data, x, y):
-        alive_count = 0
-        height = len(chunk_data)
-        width = len(chunk_data[0])
-        for i in range(-1, 2):
-            for j in range(-1, 2):
-                neighbor_x = x + i
-                neighbor_y = y + j
-                if i == 0 and j == 0:
-                    continue
-                elif neighbor_x < 0 or neighbor_y < 0 or neighbor_x >= height or neighbor_y >= width:
-                    alive_count += 1
-                elif chunk_data[neighbor_y][neighbor_x] == 'stone':
-                    alive_count += 1
-        return alive_count
-
-    def cellaut_sim_step(self, old_chunk_data):
-        new_chunk_data = np.empty((CHUNK_SIZE, CHUNK_SIZE), dtype=object)
-        height = len(old_chunk_data)
-        width = len(old_chunk_data[0])
-        for x in range(height):
-            for y in range(width):
-                alive_neighbors = self.count_alive_neighbors(old_chunk_data, x, y)
-                if old_chunk_data[y][x] == 'stone':
-                    if alive_neighbors < CELLAUT_DEATH_LIMIT:
-                        new_chunk_data[y][x] = 'air'
-                    else:
-                        new_chunk_data[y][x] = 'stone'
-                else:
-                    if alive_neighbors > CELLAUT_BIRTH_LIMIT:
-                        new_chunk_data[y][x] = 'stone'
-                    else:
-                        new_chunk_data[y][x] = 'air'
-        return new_chunk_data
-
-    def generate_trees(self, chunk_data, heightmap):
-        """Generuje drzewa na powierzchni terenu"""
-        for x in range(CHUNK_SIZE):
-            tree_noise = self.noise_generator.noise2(
-                (x + self.position[0] * CHUNK_SIZE) * 0.25,
-                self.position[1] * 0.1
-            )
-
-            random_factor = random.random() * 0.3
-            tree_chance = tree_noise + random_factor
-
-            if tree_chance > 0.5 and heightmap[x] > 5:
-                tree_height = random.randint(4, 8)
-                ground_level = heightmap[x]
-
-                if ground_level + tree_height >= CHUNK_SIZE:
-                    tree_height = CHUNK_SIZE - ground_level - 1
-
-                # Pień drzewa
-                for trunk_y in range(ground_level, min(ground_level + tree_height, CHUNK_SIZE)):
-                    if trunk_y < CHUNK_SIZE:
-                        chunk_data[x, trunk_y] = 'wood'
-
-                # Korona drzewa
-                crown_start = max(0, min(ground_level + tree_height - 3, CHUNK_SIZE - 1))
-                crown_size = random.randint(2, 3)
-
-                for crown_x in range(max(0, x - crown_size), min(CHUNK_SIZE, x + crown_size + 1)):
-                    for crown_y in range(crown_start, min(crown_start + crown_size + 2, CHUNK_SIZE)):
-                        distance = ((crown_x - x) ** 2 + (crown_y - crown_start - crown_size // 2) ** 2) ** 0.5
-                        if distance <= crown_size and chunk_data[crown_x, crown_y] == 'air':
-                            if random.random() > 0.15:
-                                chunk_data[crown_x, crown_y] = 'leaves'
-
-    def generate_ores(self, chunk_data):
-        """Generuje rudy w podziemnych chunkach"""
-        if self.position[1] <= 0:
-            return
+        # Wyrenderowane bloki chunka, tworzone gdy chunk pierwszy raz pojawi się na ekranie
+        self.surface: Optional[pygame.Surface] = None
 
-        for x in range(CHUNK_SIZE):
-            for y in range(CHUNK_SIZE):
-                if chunk_data[x, y] == 'stone':
-                    ore_noise = self.noise_generator.noise3(
-                        (x + self.position[0] * CHUNK_SIZE) * 0.1,
-                        (y + self.position[1] * CHUNK_SIZE) * 0.1,
-                        self.position[1] * 0.5
-                    )
-
-                    depth = self.position[1]
-
-                    if ore_noise > COAL_GENERATION_THRESHOLD:
-                        chunk_data[x, y] = 'coal_ore'
-                    elif ore_noise > IRON_GENERATION_THRESHOLD and depth >= 2:
-                        chunk_data[x, y] = 'iron_ore'
-                    elif ore_noise > GOLD_GENERATION_THRESHOLD and depth >= 4:
-                        chunk_data[x, y] = 'gold_ore'
-                    elif ore_noise > DIAMOND_GENERATION_THRESHOLD and depth >= 6:
-                        chunk_data[x, y] = 'diamond_ore'
-
-    def gen_chunk(self):
-        if self.position[1] < 0:
-            self.blocks = []
-            return
+        # Chunk ma zmiany gracza, których nie ma w zapisie. Niezmienione chunki nie są zapisywane,
+        # bo generacja z seeda odtwarza je identycznie
+        self.dirty = False
 
-        chunk_data = np.full((CHUNK_SIZE, CHUNK_SIZE), 'air', dtype=object)
-
-        if self.position[1] == 0:
-            heightmap = []
-
-            for x in range(CHUNK_SIZE):
-                noise_value = self.noise_generator.noise2(
-                    (x + self.position[0] * CHUNK_SIZE) * 0.05,
-                    self.position[1] * 0.1
-                )
-                height = int((noise_value + 1) * 10 + 5)
-                heightmap.append(height)
-
-            for x in range(CHUNK_SIZE):
-                height = heightmap[x]
-                for y in range(height):
-                    if y == height - 1:
-                        chunk_data[x, y] = 'grass'
-                    elif y < height - 5:
-                        chunk_data[x, y] = 'stone'
-                    else:
-                        chunk_data[x, y] = 'dirt'
-
-            self.generate_trees(chunk_data, heightmap)
-
-        if self.position[1] > 0:
-            chunk_data = self.initialize_underground_chunk(chunk_data)
-            for _ in range(CELLAUT_NUMBER_OF_STEPS):
-                chunk_data = self.cellaut_sim_step(chunk_data)
-            self.generate_ores(chunk_data)
-
-        for x in range(CHUNK_SIZE):
-            for y in range(CHUNK_SIZE):
-                if chunk_data[x, y] != 'air' and chunk_data[x, y]:
-                    name = chunk_data[x, y]
-                    if name and name != 'air':
-                        try:
-                            item_data = registry.get_data(name)
-                            use_type = item_data.use_type
-                            groups = [self.group_list[group] for group in item_data.groups]
-                            world_x = x * TILE_SIZE + CHUNK_PIXEL_SIZE * self.position[0]
-                            world_y = (CHUNK_SIZE - y) * TILE_SIZE + CHUNK_PIXEL_SIZE * self.position[1]
-                            block = use_type(groups, self.textures[name], (world_x, world_y), name)
-                            self.blocks.append(block)
-                        except KeyError:
-                            continue
-
-    def load_chunk(self):
-        for block in self.blocks:
-            try:
-                item_data = registry.get_data(block.name)
-                for group_name in item_data.groups:
-                    self.group_list[group_name].add(block)
-            except KeyError:
-                continue
+        # Siatka wygenerowana w tle, zapisany chunk albo generacja na miejscu
+        if tiles is not None:
+            self.tiles = tiles
+        else:
+            saved_data = self.scene.load_chunk_data(position)
+            if saved_data is not None:
+                self.load_from_data(saved_data)
+            else:
+                self.tiles = self.scene.world_generator.generate_chunk(position)
+
+    def load_from_data(self, data: np.ndarray):
+        """Wczytuje chunk z zapisanej siatki bloków"""
+        self.tiles = data
+
+    def get_save_data(self) -> bytes:
+        """Zwraca dane chunka do zapisu (paleta nazw bloków i indeksy uint8)"""
+        return encode_tiles(self.tiles)
+
+    def get_memory_size(self) -> int:
+        """Zwraca pamięć zajmowaną przez siatkę bloków i wyrenderowaną powierzchnię chunka"""
+        size = self.tiles.nbytes
+        if self.surface:
+            size += self.surface.get_bytesize() * self.surface.get_width() * self.surface.get_height()
+        return size
+
+    def get_block(self, column: int, row: int) -> int:
+        """Zwraca identyfikator bloku o lokalnych indeksach"""
+        return self.tiles[row, column]
+
+    def set_block(self, column: int, row: int, block_id: int):
+        """Ustawia identyfikator bloku o lokalnych indeksach"""
+        self.tiles[row, column] = block_id
+        self.dirty = True
+
+        # Przerysowanie tylko zmienionego kafelka
+        if self.surface:
+            cell = pygame.Rect(column * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+            self.surface.fill((0, 0, 0, 0), cell)
+            if block_id != AIR:
+                self.surface.blit(self.textures[block_names[block_id]], cell)
+
+    def render_surface(self) -> pygame.Surface:
+        """Rysuje wszystkie bloki chunka na przezroczystej powierzchni"""
+        surface = pygame.Surface((CHUNK_PIXEL_SIZE, CHUNK_PIXEL_SIZE), pygame.SRCALPHA)
+        rows, columns = np.nonzero(self.tiles)
+        block_textures = [self.textures.get(name) for name in block_names]
+        surface.blits([(block_textures[block_id], (column * TILE_SIZE, row * TILE_SIZE))
+                       for block_id, row, column in zip(self.tiles[rows, columns].tolist(),
+                                                        rows.tolist(), columns.tolist())], False)
+        return surface
+
+    def get_surface(self) -> pygame.Surface:
+        """Zwraca wyrenderowaną powierzchnię chunka, tworząc ją przy pierwszym użyciu"""
+        if not self.surface:
+            self.surface = self.render_surface()
+        return self.surface
 
     def unload_chunk(self):
-        for block in self.blocks:
-            block.kill()
+        """Zwalnia wyrenderowaną powierzchnię chunka (siatka bloków zostaje w pamięci)"""
+        self.surface = None
 
     @staticmethod
     def get_chunk_pos(position: tuple[int, int]):
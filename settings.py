@@ -1,15 +1,22 @@
-# Delta time
-def get_DT(clock):
-    return clock.tick(FPS) / 1000
-
 # Stałe ekranu
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = int(SCREEN_WIDTH * 0.8)
-FPS = 60
+FPS = 60  # Limit klatek renderowania (0 - bez limitu), niezależny od kroku symulacji
+SIMULATION_RATE = 60  # Kroki symulacji fizyki na sekundę
+SIMULATION_DT = 1 / SIMULATION_RATE
+MAX_FRAME_TIME = 0.25  # Górny limit czasu klatki nadrabianego przez symulację (np. po wczytywaniu świata)
 SCALE = 1
 TILE_SIZE = 16
 CHUNK_SIZE = 30
 CHUNK_PIXEL_SIZE = CHUNK_SIZE * TILE_SIZE
+CHUNK_GENERATION_MAX_WORKERS = 4  # Górny limit procesów generujących chunki w tle
+REGION_SIZE = 8  # Liczba chunków na bok pliku regionu zapisu świata
+SAVE_COMPRESSION = 'zlib'  # Kodek kompresji chunków w zapisie: 'zlib', 'lzma' lub 'none' (porównanie: python -m bench.compression_codecs)
+SAVE_COMPRESSION_LEVEL = 1  # Poziom zlib (0-9) lub preset lzma (0-9)
+
+# Profiler klatek (F3 - nakładka i pomiar, F4 - zapis śladu do profiles/)
+PROFILER_WINDOW = 300  # Liczba ostatnich klatek, z których liczone są percentyle
+PROFILER_TRACE_LIMIT = 36000  # Maksymalna liczba klatek przechowywanych do zapisu śladu
 
 # Stałe gry
 GAME_TITLE = "Terraria from Temu"
@@ -23,6 +30,7 @@ CELLAUT_CHANCE_TO_STAY_ALIVE = 0.7
 CELLAUT_DEATH_LIMIT = 5
 CELLAUT_BIRTH_LIMIT = 6
 CELLAUT_NUMBER_OF_STEPS = 4
+CELLAUT_HALO_SIZE = CELLAUT_NUMBER_OF_STEPS  # Obrzeże symulowane wokół chunka, by jaskinie łączyły się bez szwów
 
 # Stałe generowania drzew
 TREE_GENERATION_THRESHOLD = 0.6  # Im wyższa wartość, tym mniej drzew
@@ -7,15 +7,33 @@ from settings import SCREEN_WIDTH, SCREEN_HEIGHT
 class Camera(pygame.sprite.Group):
     def __init__(self):
         super().__init__()
+        # Pozycje sprite'ów z poprzedniego kroku symulacji, do interpolacji między krokami
+        self.previous_positions: dict[pygame.sprite.Sprite, tuple[int, int]] = {}
 
-    def draw(self, target: Player, display: pygame.Surface):
-        offset = pygame.math.Vector2()
-        offset.x = SCREEN_WIDTH / 2 - target.rect.centerx
-        offset.y = SCREEN_HEIGHT / 2 - target.rect.centery
+    def store_positions(self):
+        """Zapamiętuje pozycje sprite'ów przed krokiem symulacji"""
+        self.previous_positions = {sprite: sprite.rect.topleft for sprite in self.sprites()}
 
+    def interpolate(self, sprite: pygame.sprite.Sprite, alpha: float) -> tuple[float, float]:
+        """Zwraca pozycję sprite'a między poprzednim (alpha = 0) a bieżącym (alpha = 1) krokiem symulacji"""
+        previous_x, previous_y = self.previous_positions.get(sprite, sprite.rect.topleft)
+        return (previous_x + (sprite.rect.x - previous_x) * alpha,
+                previous_y + (sprite.rect.y - previous_y) * alpha)
+
+    def draw(self, target: Player, display: pygame.Surface, chunks=(), alpha: float = 1.0):
+        target_x, target_y = self.interpolate(target, alpha)
+        offset_x = round(SCREEN_WIDTH / 2 - target_x - target.rect.width / 2)
+        offset_y = round(SCREEN_HEIGHT / 2 - target_y - target.rect.height / 2)
+
+        # Widoczny obszar świata; wszystko poza nim jest pomijane
+        view = pygame.Rect(-offset_x, -offset_y, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+        # Bloki terenu rysowane są z powierzchni chunków, pod sprite'ami
+        blits = [(chunk.get_surface(), (chunk.rect.x + offset_x, chunk.rect.y + offset_y))
+                 for chunk in chunks if view.colliderect(chunk.rect)]
         for sprite in self.sprites():
-            sprite_offset = pygame.math.Vector2()
-            sprite_offset.x = offset.x + sprite.rect.x
-            sprite_offset.y = offset.y + sprite.rect.y
+            if view.colliderect(sprite.rect):
+                x, y = self.interpolate(sprite, alpha)
+                blits.append((sprite.image, (round(x) + offset_x, round(y) + offset_y)))
 
-            display.blit(sprite.image, sprite_offset)
+        display.blits(blits, False)
@@ -2,6 +2,41 @@ import pygame
 import math
 
 from settings import *
+from profiler import profiler
+
+
+def resolve_collisions(rect: pygame.Rect, previous: pygame.Rect, world, direction: str) -> bool:
+    """Dosuwa rect do najbliższego bloku na drodze ruchu wzdłuż jednej osi (swept AABB).
+
+    Sprawdzane są tylko kafelki obszaru przebytego od poprzedniej pozycji, więc koszt nie zależy
+    od liczby załadowanych bloków. Zwraca True, gdy ruch został zatrzymany przez blok.
+    """
+    with profiler.section('collision'):
+        block_rects = world.get_block_rects(rect.union(previous))
+
+        if direction == "horizontal":
+            if rect.x > previous.x: # Poruszanie w prawo
+                edges = [block.left for block in block_rects if block.left >= previous.left]
+                if edges:
+                    rect.right = min(edges)
+                    return True
+            elif rect.x < previous.x: # Poruszanie w lewo
+                edges = [block.right for block in block_rects if block.right <= previous.right]
+                if edges:
+                    rect.left = max(edges)
+                    return True
+        elif direction == "vertical":
+            if rect.y > previous.y: # Poruszanie w dół
+                edges = [block.top for block in block_rects if block.top >= previous.top]
+                if edges:
+                    rect.bottom = min(edges)
+                    return True
+            elif rect.y < previous.y: # Poruszanie w górę
+                edges = [block.bottom for block in block_rects if block.bottom <= previous.bottom]
+                if edges:
+                    rect.top = max(edges)
+                    return True
+        return False
 
 
 class Entity(pygame.sprite.Sprite):
@@ -11,7 +46,6 @@ class Entity(pygame.sprite.Sprite):
         self.active_groups = groups
         self.image = image
         self.rect = self.image.get_rect(topleft = position)
-        self.clock = pygame.time.Clock()
 
     def update(self):
         pass
@@ -19,10 +53,10 @@ class Entity(pygame.sprite.Sprite):
 class Mob(Entity):
     def __init__(self, groups, image = pygame.Surface((TILE_SIZE, TILE_SIZE)), position = (0,0), parameters = {}):
         super().__init__(groups, image, position)
-        self.DT = get_DT(pygame.time.Clock())
+        self.DT = SIMULATION_DT
 
         if parameters:
-            self.block_group = parameters['block_group']
+            self.world = parameters['world']
             self.speed = parameters['speed']
             self.player = parameters['player']
 
@@ -32,27 +66,10 @@ class Mob(Entity):
         self.attacking = True
         self.is_grounded = False
 
-    def check_collisions(self, direction):
-        if direction == "horizontal":
-            for block in self.block_group:
-                if block.rect.colliderect(self.rect):
-                    if self.velocity.x > 0: # Poruszanie w prawo
-                        self.rect.right = block.rect.left
-                    if self.velocity.x < 0: # Poruszanie w prawo
-                        self.rect.left = block.rect.right
-        elif direction == "vertical":
-            collisions = 0
-            for block in self.block_group:
-                if block.rect.colliderect(self.rect):
-                    if self.velocity.y > 0: # Poruszanie w dół
-                        self.rect.bottom =block.rect.top
-                        collisions += 1
-                    if self.velocity.y < 0: # Poruszanie w górę
-                        self.rect.top =block.rect.bottom
-            if collisions > 0:
-                self.is_grounded = True
-            else:
-                self.is_grounded = False
+    def check_collisions(self, direction, previous: pygame.Rect):
+        collided = resolve_collisions(self.rect, previous, self.world, direction)
+        if direction == "vertical":
+            self.is_grounded = collided and self.velocity.y > 0
 
     def vel_check(self):
         if self.velocity.y > MAX_Y_VELOCITY:
@@ -83,11 +100,13 @@ class Mob(Entity):
 
         self.vel_check()
 
+        previous = self.rect.copy()
         self.rect.y += self.velocity.y * self.DT
-        self.check_collisions('vertical')
+        self.check_collisions('vertical', previous)
 
+        previous = self.rect.copy()
         self.rect.x += self.velocity.x
-        self.check_collisions('horizontal')
+        self.check_collisions('horizontal', previous)
 
     def update(self):
         self.move()
@@ -0,0 +1,40 @@
+import pygame
+from os import listdir
+
+from settings import *
+
+
+class SpriteCache:
+    """Wspólny cache tekstur i klatek animacji: każdy plik jest wczytywany, konwertowany,
+    skalowany i odbijany tylko raz, a obiekty gry dostają te same powierzchnie"""
+
+    def __init__(self):
+        self.images: dict[tuple, pygame.Surface] = {}
+        self.animations: dict[str, tuple[list[pygame.Surface], list[pygame.Surface]]] = {}
+
+    def get_image(self, file_path: str, size: tuple[int, int] = None) -> pygame.Surface:
+        """Zwraca teksturę z pliku, opcjonalnie przeskalowaną do podanego rozmiaru"""
+        key = (file_path, size)
+        if key not in self.images:
+            image = pygame.image.load(file_path).convert_alpha()
+            if size:
+                image = pygame.transform.scale(image, size)
+            self.images[key] = image
+        return self.images[key]
+
+    def get_animation(self, directory: str) -> tuple[list[pygame.Surface], list[pygame.Surface]]:
+        """Zwraca klatki animacji z katalogu (pliki 0.png, 1.png, ...) oraz ich odbicia w poziomie"""
+        if directory not in self.animations:
+            frames = []
+            # Sprawdzenie ilości klatek w folderze
+            for i in range(len(listdir(directory))):
+                img = pygame.image.load(f'{directory}/{i}.png').convert_alpha()
+                img = pygame.transform.scale(img, (int(img.get_width()), (int(img.get_height() * SCALE))))
+                frames.append(img)
+            flipped_frames = [pygame.transform.flip(frame, True, False) for frame in frames]
+            self.animations[directory] = (frames, flipped_frames)
+        return self.animations[directory]
+
+
+# Globalny cache tekstur
+sprite_cache = SpriteCache()
@@ -20,4 +20,9 @@ solo_texture_data = {
     # Reimplementacja tekstur gracza (niezaimplementowana)
     # 'player_static': {'type':'player', 'file_path':'Assets/player/idle/0.png', 'size':(TILE_SIZE, TILE_SIZE)}
     'zombie_static': {'type':'enemy', 'file_path':'Assets/mobs/zombie.png', 'size':(TILE_SIZE, TILE_SIZE)}
-}
\ No newline at end of file
+}
+
+# Identyfikatory bloków przechowywane w siatce chunka (0 oznacza powietrze)
+AIR = 0
+block_names = ['air'] + list(atlas_texture_data)
+block_ids = {name: block_id for block_id, name in enumerate(block_names)}
@@ -0,0 +1,260 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import numpy as np
+from opensimplex import OpenSimplex
+
+from settings import *
+from texture_data import block_ids, AIR
+
+
+class WorldGenerator:
+    """Wspólny kontekst generacji świata wyprowadzający losowość z seeda świata"""
+
+    def __init__(self, world_seed: int):
+        self.world_seed = world_seed
+        self.noise_generator = OpenSimplex(seed=world_seed)
+
+    def chunk_rng(self, chunk_pos: tuple[int, int]) -> np.random.Generator:
+        """Zwraca niezależny strumień losowy chunka, zależny tylko od (seed, x, y)"""
+        entropy = [self.world_seed & 0xFFFFFFFFFFFFFFFF, chunk_pos[0] & 0xFFFFFFFF, chunk_pos[1] & 0xFFFFFFFF]
+        return np.random.default_rng(entropy)
+
+    def generate_chunk(self, chunk_pos: tuple[int, int]) -> np.ndarray:
+        """Generuje siatkę identyfikatorów bloków chunka indeksowaną [wiersz, kolumna]"""
+        # Dane generacji indeksowane są [x, y] z osią y skierowaną w górę
+        chunk_data = np.full((CHUNK_SIZE, CHUNK_SIZE), AIR, dtype=np.uint8)
+
+        if chunk_pos[1] == 0:
+            heightmap = self.sample_heightmap(chunk_pos)
+            height = heightmap.reshape(-1, 1)
+            y = np.arange(CHUNK_SIZE).reshape(1, -1)
+
+            chunk_data[y < height] = block_ids['dirt']
+            chunk_data[y < height - 5] = block_ids['stone']
+            chunk_data[y == height - 1] = block_ids['grass']
+
+            self.generate_trees(chunk_data, heightmap, chunk_pos, self.chunk_rng(chunk_pos))
+
+        if chunk_pos[1] > 0:
+            # Jaskinie są w układzie [wiersz, kolumna]
+            cells = self.generate_caves(chunk_pos)
+            chunk_data[np.flipud(cells).T] = block_ids['stone']
+            self.generate_ores(chunk_data, chunk_pos)
+
+        return np.ascontiguousarray(np.flipud(chunk_data.T))
+
+    def world_columns(self, chunk_pos: tuple[int, int]) -> np.ndarray:
+        """Zwraca współrzędne x kafelków chunka w świecie"""
+        return np.arange(CHUNK_SIZE) + chunk_pos[0] * CHUNK_SIZE
+
+    def sample_heightmap(self, chunk_pos: tuple[int, int]) -> np.ndarray:
+        """Próbkuje wysokość terenu dla wszystkich kolumn chunka jednym wywołaniem szumu"""
+        noise_values = self.noise_generator.noise2array(self.world_columns(chunk_pos) * 0.05,
+                                                        np.array([chunk_pos[1] * 0.1]))[0]
+        return ((noise_values + 1) * 10 + 5).astype(int)
+
+    def cave_seed_cells(self, tile_x: np.ndarray, tile_y: np.ndarray):
+        """Losuje początkowy stan komórek jaskini deterministycznie ze współrzędnych kafelków w świecie"""
+        cell_hash = (tile_x.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+                     ^ tile_y.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+                     ^ np.uint64(self.world_seed & 0xFFFFFFFFFFFFFFFF))
+
+        # Finalizator splitmix64 miesza bity, by sąsiednie komórki były niezależne
+        cell_hash ^= cell_hash >> np.uint64(30)
+        cell_hash *= np.uint64(0xBF58476D1CE4E5B9)
+        cell_hash ^= cell_hash >> np.uint64(27)
+        cell_hash *= np.uint64(0x94D049BB133111EB)
+        cell_hash ^= cell_hash >> np.uint64(31)
+
+        return (cell_hash >> np.uint64(11)) * 2.0 ** -53 <= CELLAUT_CHANCE_TO_STAY_ALIVE
+
+    def generate_caves(self, chunk_pos: tuple[int, int]):
+        """Generuje jaskinie chunka (True oznacza kamień) automatem komórkowym.
+
+        Chunk symulowany jest razem z obrzeżem szerokości CELLAUT_HALO_SIZE, którego stan
+        początkowy wynika wyłącznie ze współrzędnych świata, więc wynik nie zależy od kolejności
+        generowania chunków i nie ma ścian na ich granicach.
+        """
+        halo = CELLAUT_HALO_SIZE
+        offsets = np.arange(CHUNK_SIZE + 2 * halo) - halo
+
+        cells = self.cave_seed_cells(chunk_pos[0] * CHUNK_SIZE + offsets.reshape(1, -1),
+                                     chunk_pos[1] * CHUNK_SIZE + offsets.reshape(-1, 1))
+        for _ in range(CELLAUT_NUMBER_OF_STEPS):
+            cells = self.cellaut_sim_step(cells)
+
+        return cells[halo:halo + CHUNK_SIZE, halo:halo + CHUNK_SIZE]
+
+    @staticmethod
+    def count_alive_neighbors(cells):
+        """Zlicza żywych sąsiadów każdej komórki sumą przesuniętych wycinków (komórki poza siatką są żywe)"""
+        padded = np.pad(cells.astype(np.uint8), 1, constant_values=1)
+
+        # Suma okna 3x3 liczona osobno w pionie i w poziomie, bez komórki środkowej
+        rows = padded[:-2, :] + padded[1:-1, :] + padded[2:, :]
+        return rows[:, :-2] + rows[:, 1:-1] + rows[:, 2:] - cells
+
+    @staticmethod
+    def cellaut_sim_step(cells):
+        """Wykonuje krok automatu komórkowego na siatce wartości logicznych"""
+        alive_neighbors = WorldGenerator.count_alive_neighbors(cells)
+        return np.where(cells, alive_neighbors >= CELLAUT_DEATH_LIMIT, alive_neighbors > CELLAUT_BIRTH_LIMIT)
+
+    def generate_trees(self, chunk_data, heightmap, chunk_pos: tuple[int, int], rng: np.random.Generator):
+        """Generuje drzewa na powierzchni terenu"""
+        tree_noise = self.noise_generator.noise2array(self.world_columns(chunk_pos) * 0.25,
+                                                      np.array([chunk_pos[1] * 0.1]))[0]
+
+        for x in range(CHUNK_SIZE):
+            random_factor = rng.random() * 0.3
+            tree_chance = tree_noise[x] + random_factor
+
+            if tree_chance > 0.5 and heightmap[x] > 5:
+                tree_height = int(rng.integers(4, 9))
+                ground_level = int(heightmap[x])
+
+                if ground_level + tree_height >= CHUNK_SIZE:
+                    tree_height = CHUNK_SIZE - ground_level - 1
+
+                # Pień drzewa
+                chunk_data[x, ground_level:min(ground_level + tree_height, CHUNK_SIZE)] = block_ids['wood']
+
+                # Korona drzewa
+                crown_start = max(0, min(ground_level + tree_height - 3, CHUNK_SIZE - 1))
+                crown_size = int(rng.integers(2, 4))
+
+                for crown_x in range(max(0, x - crown_size), min(CHUNK_SIZE, x + crown_size + 1)):
+                    for crown_y in range(crown_start, min(crown_start + crown_size + 2, CHUNK_SIZE)):
+                        distance = ((crown_x - x) ** 2 + (crown_y - crown_start - crown_size // 2) ** 2) ** 0.5
+                        if distance <= crown_size and chunk_data[crown_x, crown_y] == AIR:
+                            if rng.random() > 0.15:
+                                chunk_data[crown_x, crown_y] = block_ids['leaves']
+
+    def generate_ores(self, chunk_data, chunk_pos: tuple[int, int]):
+        """Generuje rudy w podziemnych chunkach"""
+        if chunk_pos[1] <= 0:
+            return
+
+        # Szum rud dla całego chunka jednym wywołaniem, transponowany do układu [x, y]
+        ys = np.arange(CHUNK_SIZE) + chunk_pos[1] * CHUNK_SIZE
+        ore_noise = self.noise_generator.noise3array(self.world_columns(chunk_pos) * 0.1, ys * 0.1,
+                                                     np.array([chunk_pos[1] * 0.5]))[0].T
+
+        depth = chunk_pos[1]
+        stone = chunk_data == block_ids['stone']
+
+        # Pierwszy spełniony warunek wygrywa, tak jak w kolejnych gałęziach elif
+        ores = np.select([ore_noise > COAL_GENERATION_THRESHOLD,
+                          (ore_noise > IRON_GENERATION_THRESHOLD) & (depth >= 2),
+                          (ore_noise > GOLD_GENERATION_THRESHOLD) & (depth >= 4),
+                          (ore_noise > DIAMOND_GENERATION_THRESHOLD) & (depth >= 6)],
+                         [block_ids['coal_ore'], block_ids['iron_ore'], block_ids['gold_ore'], block_ids['diamond_ore']],
+                         default=block_ids['stone'])
+        chunk_data[stone] = ores[stone]
+
+
+# Generator świata procesu roboczego puli (tworzony raz na proces)
+_worker_generator: Optional[WorldGenerator] = None
+
+
+def _init_worker(world_seed: int):
+    global _worker_generator
+    _worker_generator = WorldGenerator(world_seed)
+
+
+def _generate_in_worker(chunk_pos: tuple[int, int]) -> np.ndarray:
+    return _worker_generator.generate_chunk(chunk_pos)
+
+
+class ChunkGenerationService:
+    """Generuje chunki w tle w puli procesów; wątek gry tylko odbiera gotowe siatki bloków"""
+
+    def __init__(self, world_generator: WorldGenerator, max_workers: int = None, synchronous: bool = False):
+        self.world_generator = world_generator
+        self.max_workers = max_workers or max(1, min(CHUNK_GENERATION_MAX_WORKERS, (os.cpu_count() or 2) - 1))
+
+        # Do puli trafia tylko kilka zadań naraz, reszta czeka w kolejce priorytetowej
+        self.max_in_flight = self.max_workers * 2
+        self.waiting: list[tuple[int, int]] = []
+        self.in_flight: dict[tuple[int, int], Future] = {}
+
+        # Tryb synchroniczny: bez puli, jeden chunk generowany w wątku gry na wywołanie poll
+        if synchronous:
+            self.executor = None
+            return
+
+        try:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                mp_context=multiprocessing.get_context('spawn'),
+                                                initializer=_init_worker, initargs=(world_generator.world_seed,))
+        except (OSError, NotImplementedError) as e:
+            print(f"Pula procesów niedostępna, generacja w wątku gry: {e}")
+            self.executor = None
+
+    def is_pending(self, chunk_pos: tuple[int, int]) -> bool:
+        """Sprawdza, czy chunk czeka na wygenerowanie"""
+        return chunk_pos in self.in_flight or chunk_pos in self.waiting
+
+    def request(self, positions: list[tuple[int, int]]):
+        """Ustala listę chunków do wygenerowania w kolejności priorytetu.
+
+        Oczekujące zgłoszenia spoza listy są anulowane, a kolejka przyjmuje kolejność nowej listy.
+        """
+        wanted = set(positions)
+        for chunk_pos in [pos for pos in self.in_flight if pos not in wanted]:
+            if self.in_flight[chunk_pos].cancel():
+                del self.in_flight[chunk_pos]
+
+        self.waiting = [pos for pos in positions if pos not in self.in_flight]
+        self._submit()
+
+    def _submit(self):
+        """Przekazuje do puli kolejne chunki z początku kolejki"""
+        if not self.executor:
+            return
+
+        while self.waiting and len(self.in_flight) < self.max_in_flight:
+            chunk_pos = self.waiting.pop(0)
+            try:
+                self.in_flight[chunk_pos] = self.executor.submit(_generate_in_worker, chunk_pos)
+            except (BrokenProcessPool, RuntimeError) as e:
+                print(f"Pula procesów przestała działać, generacja w wątku gry: {e}")
+                self.waiting.insert(0, chunk_pos)
+                self.executor = None
+                return
+
+    def poll(self, max_results: int = None) -> list[tuple[tuple[int, int], np.ndarray]]:
+        """Zwraca wygenerowane chunki (pozycja, siatka bloków), bez blokowania wątku gry"""
+        results = []
+        for chunk_pos, future in list(self.in_flight.items()):
+            if max_results is not None and len(results) >= max_results:
+                break
+            if not future.done():
+                continue
+
+            del self.in_flight[chunk_pos]
+            try:
+                results.append((chunk_pos, future.result()))
+            except Exception as e:
+                print(f"Błąd generowania chunka {chunk_pos} w tle: {e}")
+                self.waiting.insert(0, chunk_pos)
+
+        # Bez puli procesów generujemy po jednym chunku na wywołanie
+        if not self.executor and self.waiting and (max_results is None or len(results) < max_results):
+            chunk_pos = self.waiting.pop(0)
+            results.append((chunk_pos, self.world_generator.generate_chunk(chunk_pos)))
+
+        self._submit()
+        return results
+
+    def shutdown(self):
+        """Zatrzymuje pulę procesów, porzucając niewykonane zadania"""
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.in_flight.clear()
+        self.waiting.clear()
@@ -1,106 +1,324 @@
 import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 import time
 import gzip
 from typing import Optional, Dict, Any
+import numpy as np
+
+from region_file import RegionFile
+from settings import REGION_SIZE, SAVE_COMPRESSION, SAVE_COMPRESSION_LEVEL
+from compression import COMPRESSION_CODECS
+from chunk_codec import CHUNK_CODEC_VERSION, encode_tiles, decode_tiles, tiles_from_legacy
+
+
+class ChunkCache:
+    """Cache LRU zakodowanych chunków (chunk_codec) z limitem zajmowanej pamięci"""
+
+    def __init__(self, memory_limit: int):
+        self.memory_limit = memory_limit
+        self.entries: OrderedDict[tuple[int, int], bytes] = OrderedDict()
+        self.memory_used = 0
+
+        # Statystyki
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, chunk_pos: tuple[int, int]) -> bool:
+        return chunk_pos in self.entries
+
+    def get(self, chunk_pos: tuple[int, int]) -> Optional[bytes]:
+        """Zwraca zakodowany chunk z cache i oznacza go jako ostatnio użyty"""
+        data = self.entries.get(chunk_pos)
+        if data is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(chunk_pos)
+        return data
+
+    def put(self, chunk_pos: tuple[int, int], data: bytes):
+        """Dodaje zakodowany chunk do cache, usuwając najdawniej używane wpisy ponad limit pamięci"""
+        self.invalidate(chunk_pos)
+        self.entries[chunk_pos] = data
+        self.memory_used += len(data)
+
+        while self.memory_used > self.memory_limit and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.memory_used -= len(evicted)
+            self.evictions += 1
+
+    def invalidate(self, chunk_pos: tuple[int, int]):
+        """Usuwa wpis chunka, np. po zleceniu zapisu jego nowszych danych"""
+        data = self.entries.pop(chunk_pos, None)
+        if data is not None:
+            self.memory_used -= len(data)
+
+    def get_stats(self) -> dict:
+        """Zwraca statystyki cache"""
+        return {
+            'entries': len(self.entries),
+            'memory_used': self.memory_used,
+            'memory_limit': self.memory_limit,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
 
 
 class WorldManager:
     """Menedżer świata obsługujący zapisywanie i wczytywanie danych"""
 
-    def __init__(self, world_name: str = "default_world", game_version: str = '0.2.0'):
+    def __init__(self, world_name: str = "default_world", game_version: str = '0.2.0',
+                 compression: str = SAVE_COMPRESSION, compression_level: int = SAVE_COMPRESSION_LEVEL):
         self.world_name = world_name
         self.world_seed = 121367
         self.game_version = game_version
 
-        # Ścieżki plików
+        # Kodek kompresji chunków w plikach regionów (zapisywany w nagłówku każdego regionu);
+        # błędne ustawienia zgłaszane od razu, a nie dopiero w wątku zapisu
+        if compression not in COMPRESSION_CODECS:
+            raise ValueError(f"Nieznany kodek kompresji: {compression!r} "
+                             f"(dostępne: {', '.join(COMPRESSION_CODECS)})")
+        if not 0 <= compression_level <= 9:
+            raise ValueError(f"Poziom kompresji musi być w zakresie 0-9: {compression_level}")
+        self.compression = COMPRESSION_CODECS[compression]
+        self.compression_level = compression_level
+
+        # Ścieżki plików: metadane w pliku .dat, chunki w plikach regionów w katalogu świata
         self.saves_dir = Path("saves")
         self.saves_dir.mkdir(exist_ok=True)
         self.world_file = self.saves_dir / f"{world_name}.dat"
+        self.backup_file = self.world_file.with_suffix('.dat.backup')
+        self.region_dir = self.saves_dir / world_name
+
+        # Otwarte pliki regionów (tylko nagłówki, dane chunków czytane na żądanie)
+        self.regions: dict[tuple[int, int], RegionFile] = {}
+        self.regions_lock = threading.Lock()
+
+        # Wątek zapisu: jeden, by zapisy wykonywały się w kolejności zlecenia
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='world-writer')
+        # Zakodowane chunki przekazane do zapisu, ale jeszcze niezapisane na dysku
+        self.pending_chunks: dict[tuple[int, int], bytes] = {}
+        # Chunki oczekujące, których zapis się nie udał - dołączane do następnego zlecenia zapisu
+        self.failed_chunks: set[tuple[int, int]] = set()
+        self.pending_lock = threading.Lock()
 
         self.world_data = self.load_world_data()
 
-        # Cache dla chunków
-        self.chunk_cache = {}
-        self.cache_size_limit = 50
+        # Cache LRU dla wczytanych chunków
+        self.chunk_cache = ChunkCache(memory_limit=1024 * 1024)
 
     def load_world_data(self) -> dict:
         """Wczytuje dane świata"""
-        if not self.world_file.exists():
+        if not self.world_file.exists() and not self.backup_file.exists():
             return self._create_new_world_data()
 
         try:
-            return self._load_data()
+            world_data = self._load_data()
         except Exception as e:
             print(f"Błąd wczytywania świata: {e}")
             return self._create_new_world_data()
 
+        # Stary format trzymał wszystkie chunki w jednym pliku
+        if 'chunks' in world_data:
+            self._migrate_legacy_chunks(world_data)
+        # Chunki zapisane jako JSON przed wprowadzeniem binarnego kodeka
+        elif world_data['metadata'].get('chunk_format') != CHUNK_CODEC_VERSION:
+            self._migrate_json_chunks(world_data)
+        return world_data
+
     def _create_new_world_data(self) -> dict:
         """Tworzy nowe dane świata"""
         return {
-            'chunks': {},
             'world_info': {'seed': self.world_seed},
             'metadata': {
                 'world_name': self.world_name,
                 'created': time.time(),
                 'last_modified': time.time(),
-                'version': self.game_version
+                'version': self.game_version,
+                'chunk_count': 0,
+                'chunk_format': CHUNK_CODEC_VERSION
             }
         }
 
+    def _migrate_legacy_chunks(self, world_data: dict):
+        """Przenosi chunki z jednoplikowego zapisu do plików regionów"""
+        chunks = world_data.pop('chunks')
+        self.world_data = world_data
+        legacy_chunks = {}
+        for chunk_key, chunk_data in chunks.items():
+            x, y = chunk_key.split('_')
+            legacy_chunks[(int(x), int(y))] = chunk_data
+        payloads = {pos: encode_tiles(tiles) for pos, tiles in tiles_from_legacy(legacy_chunks).items()}
+
+        chunk_delta = self._write_payloads(payloads)
+        world_data['metadata']['chunk_count'] = chunk_delta
+        world_data['metadata']['chunk_format'] = CHUNK_CODEC_VERSION
+        self._save_data()
+        print(f"Świat '{self.world_name}' przeniesiony do formatu regionów ({len(payloads)} chunków)")
+
+    def _migrate_json_chunks(self, world_data: dict):
+        """Przekodowuje chunki JSON w plikach regionów do formatu binarnego"""
+        self.world_data = world_data
+
+        # Wszystkie chunki JSON wczytywane są naraz, bo bloki mogą należeć do chunka z sąsiedniego regionu
+        legacy_chunks = {}
+        for path in self.region_dir.glob('r.*.region'):
+            _, rx, ry, _ = path.name.split('.')
+            region_pos = (int(rx), int(ry))
+            region = self._get_region(region_pos)
+
+            for x in range(region_pos[0] * REGION_SIZE, (region_pos[0] + 1) * REGION_SIZE):
+                for y in range(region_pos[1] * REGION_SIZE, (region_pos[1] + 1) * REGION_SIZE):
+                    payload = region.read_chunk((x, y))
+                    if payload and payload[:1] in (b'{', b'['):
+                        legacy_chunks[(x, y)] = json.loads(bytes(payload))
+
+        payloads = {pos: encode_tiles(tiles) for pos, tiles in tiles_from_legacy(legacy_chunks).items()}
+        if payloads:
+            self._write_payloads(payloads)
+        migrated = len(payloads)
+
+        world_data['metadata']['chunk_format'] = CHUNK_CODEC_VERSION
+        self._save_data()
+        print(f"Świat '{self.world_name}' przekodowany do binarnego formatu chunków ({migrated} chunków)")
+
     def _load_data(self) -> dict:
         """Wczytuje skompresowane dane JSON"""
-        with gzip.open(self.world_file, 'rt', encoding='utf-8') as f:
+        # Brak pliku świata przy istniejącym backupie oznacza zapis przerwany między podmianami plików
+        path = self.world_file if self.world_file.exists() else self.backup_file
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
             return json.load(f)
 
-    def save_world_data(self, chunks_data: Dict[tuple, Any]):
-        """Zapisuje dane świata"""
+    def _get_region(self, region_pos: tuple[int, int]) -> RegionFile:
+        """Zwraca plik regionu, wczytując jego nagłówek przy pierwszym użyciu"""
+        with self.regions_lock:
+            if region_pos not in self.regions:
+                path = self.region_dir / f"r.{region_pos[0]}.{region_pos[1]}.region"
+                self.regions[region_pos] = RegionFile(path, self.compression, self.compression_level)
+            return self.regions[region_pos]
+
+    def _write_payloads(self, payloads: Dict[tuple, Optional[bytes]]) -> int:
+        """Zapisuje dane chunków do plików regionów, do których należą (dopisując tylko zmienione dane).
+        Zwraca zmianę liczby zapisanych chunków"""
+        by_region: dict[tuple[int, int], dict] = {}
+        for pos, payload in payloads.items():
+            by_region.setdefault(RegionFile.region_pos(pos), {})[pos] = payload
+
+        self.region_dir.mkdir(exist_ok=True)
+        chunk_delta = 0
+        for region_pos, region_payloads in by_region.items():
+            region = self._get_region(region_pos)
+            count_before = region.chunk_count()
+            region.write_chunks(region_payloads)
+            chunk_delta += region.chunk_count() - count_before
+        return chunk_delta
+
+    def save_chunks(self, chunks_data: Dict[tuple, Any]) -> Future:
+        """Zleca zapis podanych chunków (bez metadanych) wątkowi zapisu.
+        Zwraca Future z wynikiem True, gdy zapis się udał"""
+        snapshot = self._snapshot_chunks(chunks_data)
+        return self.writer.submit(self._write_chunks, snapshot)
+
+    def save_world_data(self, chunks_data: Dict[tuple, Any]) -> Future:
+        """Zleca zapis danych świata: podanych chunków i metadanych"""
+        snapshot = self._snapshot_chunks(chunks_data)
+        return self.writer.submit(lambda: self._write_chunks(snapshot) and self._write_metadata())
+
+    def _snapshot_chunks(self, chunks_data: Dict[tuple, Any]) -> dict[tuple[int, int], bytes]:
+        """Koduje chunki w wątku głównym do niezmiennych bajtów przekazywanych wątkowi zapisu.
+        Dołącza oczekujące chunki z nieudanych zapisów, także tych już usuniętych z pamięci sceny"""
+        snapshot = {pos: chunk.get_save_data() for pos, chunk in chunks_data.items()}
+        with self.pending_lock:
+            for pos in self.failed_chunks:
+                if pos not in snapshot and pos in self.pending_chunks:
+                    snapshot[pos] = self.pending_chunks[pos]
+            self.failed_chunks.clear()
+            self.pending_chunks.update(snapshot)
+        for pos in snapshot:
+            self.chunk_cache.invalidate(pos)
+        return snapshot
+
+    def _write_chunks(self, snapshot: dict[tuple[int, int], bytes]) -> bool:
+        """Kompresuje i zapisuje chunki do plików regionów (wątek zapisu)"""
         try:
-            # Aktualizuj dane chunków
-            for pos, chunk in chunks_data.items():
-                chunk_key = f"{pos[0]}_{pos[1]}"
-                self.world_data['chunks'][chunk_key] = chunk.get_save_data()
+            chunk_delta = self._write_payloads(snapshot)
+            self.world_data['metadata']['chunk_count'] = self.world_data['metadata'].get('chunk_count', 0) + chunk_delta
 
-            # Aktualizuj metadane
-            self.world_data['metadata']['last_modified'] = time.time()
-            self.world_data['metadata']['chunk_count'] = len(self.world_data['chunks'])
+            # Chunki zapisane na dysku; nowsze dane zlecone w międzyczasie zostają w oczekujących
+            with self.pending_lock:
+                for pos, data in snapshot.items():
+                    if self.pending_chunks.get(pos) is data:
+                        del self.pending_chunks[pos]
+            return True
 
+        except Exception as e:
+            print(f"Błąd zapisywania chunków: {e}")
+            with self.pending_lock:
+                self.failed_chunks.update(snapshot)
+            return False
+
+    def _write_metadata(self) -> bool:
+        """Zapisuje metadane świata (wątek zapisu)"""
+        try:
+            self.world_data['metadata']['last_modified'] = time.time()
             self._save_data()
-            print(f"Świat '{self.world_name}' zapisany ({len(self.world_data['chunks'])} chunków)")
+            print(f"Świat '{self.world_name}' zapisany ({self.world_data['metadata']['chunk_count']} chunków)")
+            return True
 
         except Exception as e:
             print(f"Błąd zapisywania świata: {e}")
+            return False
 
     def _save_data(self):
-        """Zapisuje dane w skompresowanym formacie"""
-        backup_file = self.world_file.with_suffix('.dat.backup')
+        """Zapisuje metadane świata w skompresowanym formacie"""
+        data = gzip.compress(json.dumps(self.world_data, separators=(',', ':')).encode('utf-8'))
+
+        # Zapis do pliku tymczasowego, by przerwany zapis nie uszkodził świata
+        temp_file = self.world_file.with_suffix('.dat.tmp')
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
 
-        # Utwórz backup
+        # Poprzedni plik staje się backupem przez zmianę nazwy zamiast kopiowania
         if self.world_file.exists():
-            import shutil
-            shutil.copy2(self.world_file, backup_file)
+            os.replace(self.world_file, self.backup_file)
+        os.replace(temp_file, self.world_file)
 
-        # Zapisz skompresowane dane
-        with gzip.open(self.world_file, 'wt', encoding='utf-8') as f:
-            json.dump(self.world_data, f, separators=(',', ':'))
+    def has_chunk_data(self, chunk_pos: tuple[int, int]) -> bool:
+        """Sprawdza, czy chunk jest zapisany lub w cache, bez czytania jego danych"""
+        if chunk_pos in self.pending_chunks or chunk_pos in self.chunk_cache:
+            return True
+        return self._get_region(RegionFile.region_pos(chunk_pos)).has_chunk(chunk_pos)
 
-    def load_chunk_data(self, chunk_pos: tuple[int, int]) -> Optional[dict]:
-        """Wczytuje dane chunka"""
-        chunk_key = f"{chunk_pos[0]}_{chunk_pos[1]}"
+    def load_chunk_data(self, chunk_pos: tuple[int, int]) -> Optional[np.ndarray]:
+        """Wczytuje siatkę bloków chunka"""
+        # Chunk czekający na zapis ma nowsze dane niż plik regionu i cache
+        with self.pending_lock:
+            pending = self.pending_chunks.get(chunk_pos)
+        if pending is not None:
+            return decode_tiles(pending)
 
         # Sprawdź cache
-        if chunk_key in self.chunk_cache:
-            return self.chunk_cache[chunk_key]
+        chunk_data = self.chunk_cache.get(chunk_pos)
+        if chunk_data is not None:
+            return decode_tiles(chunk_data)
 
-        # Sprawdź dane świata
-        chunk_data = self.world_data['chunks'].get(chunk_key)
-        if chunk_data:
-            # Dodaj do cache
-            if len(self.chunk_cache) < self.cache_size_limit:
-                self.chunk_cache[chunk_key] = chunk_data
-            return chunk_data
+        # Dekodowanie prosto z zmapowanego pliku regionu, czytane są tylko bajty tego chunka (bez kompresji
+        # bez kopiowania). Wczytany chunk trafia do cache dopiero po usunięciu z pamięci sceny (cache_chunk)
+        return self._get_region(RegionFile.region_pos(chunk_pos)).read_chunk(chunk_pos, decode_tiles)
 
-        return None
+    def cache_chunk(self, chunk_pos: tuple[int, int], tiles: np.ndarray):
+        """Przechowuje w cache zakodowaną siatkę chunka usuniętego z pamięci sceny,
+        by jego ponowne wczytanie nie wymagało generacji ani odczytu z dysku"""
+        self.chunk_cache.put(chunk_pos, encode_tiles(tiles))
 
     def get_world_info(self) -> dict:
         """Zwraca informacje o świecie"""
@@ -110,8 +328,16 @@ class WorldManager:
         return {
             'name': metadata.get('world_name', self.world_name),
             'seed': world_info.get('seed', self.world_seed),
-            'chunk_count': len(self.world_data.get('chunks', {})),
+            'chunk_count': metadata.get('chunk_count', 0),
             'last_modified': metadata.get('last_modified', 0),
             'created': metadata.get('created', 0),
             'version': metadata.get('version', self.game_version)
-        }
\ No newline at end of file
+        }
+
+    def close(self):
+        """Czeka na zakończenie zleconych zapisów i zamyka pliki regionów"""
+        self.writer.shutdown(wait=True)
+        with self.regions_lock:
+            for region in self.regions.values():
+                region.close()
+            self.regions.clear()